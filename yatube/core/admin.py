@@ -0,0 +1,52 @@
+from django.contrib import admin
+
+from .models import OutboundEmail, SlowQuery, Task
+
+
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = (
+        'sql', 'view', 'count', 'total_time', 'avg_time', 'max_time',
+        'last_seen',
+    )
+    list_filter = ('view',)
+    search_fields = ('sql', 'view')
+    readonly_fields = (
+        'fingerprint', 'sql', 'view', 'plan', 'count', 'total_time',
+        'max_time', 'last_seen',
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+
+admin.site.register(SlowQuery, SlowQueryAdmin)
+
+
+class TaskAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk', 'name', 'status', 'priority', 'attempts', 'run_after',
+        'updated',
+    )
+    list_filter = ('status', 'name')
+    readonly_fields = (
+        'name', 'args', 'kwargs', 'status', 'attempts', 'max_attempts',
+        'run_after', 'locked_at', 'last_error', 'created', 'updated',
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+
+admin.site.register(Task, TaskAdmin)
+
+
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'subject', 'to', 'status', 'attempts', 'created',
+                    'sent_at')
+    list_filter = ('status',)
+    search_fields = ('subject', 'to')
+    readonly_fields = ('status', 'attempts', 'send_after', 'last_error',
+                       'created', 'sent_at')
+
+
+admin.site.register(OutboundEmail, OutboundEmailAdmin)
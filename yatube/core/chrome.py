@@ -0,0 +1,55 @@
+import hashlib
+import re
+from urllib.parse import parse_qsl, urlencode
+
+from django.template.loader import render_to_string
+
+# Персональные куски страницы («хром»): шапка, кнопки подписки и
+# редактирования. В режиме раздельного рендера вместо них в тело страницы
+# попадают маркеры, которые middleware заполняет для каждого пользователя.
+MARKER_RE = re.compile(r'<!--chrome:(\w+):([^>]*)-->')
+
+_fragments = {}
+
+
+def fragment(name, template_name):
+    def decorator(func):
+        _fragments[name] = (template_name, func)
+        return func
+    return decorator
+
+
+def render(request, name, params):
+    template_name, func = _fragments[name]
+    context = func(request, **params)
+    if context is None:
+        return ''
+    return render_to_string(template_name, context, request=request)
+
+
+def marker(name, params):
+    return f'<!--chrome:{name}:{urlencode(params)}-->'
+
+
+def splice(request, content):
+    def replace(match):
+        name, query = match.groups()
+        if name not in _fragments:
+            return match.group(0)
+        return render(request, name, dict(parse_qsl(query)))
+    return MARKER_RE.sub(replace, content)
+
+
+def body_key(request):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'chrome:body:{path}'
+
+
+@fragment('header', 'includes/header.html')
+def header(request):
+    return {}
+
+
+@fragment('switcher', 'includes/switcher.html')
+def switcher(request):
+    return {}
@@ -0,0 +1,44 @@
+import re
+
+# Блоки, где пробелы значимы: их содержимое не трогаем.
+PROTECTED_RE = re.compile(
+    r'<(pre|textarea|script|style)\b.*?</\1\s*>', re.S | re.I)
+# Сворачиваем только пробельные серии с переводом строки: для браузера
+# они равнозначны одному переводу строки, а пробелы внутри строки
+# (в том числе вывод linebreaks) остаются как есть.
+NEWLINE_SPACE_RE = re.compile(r'[ \t\r\n]*\n[ \t\r\n]*')
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/javascript', 'image/svg+xml',
+)
+GZIP_RE = re.compile(r'\bgzip\b')
+
+
+def minify(html):
+    parts = []
+    position = 0
+    for match in PROTECTED_RE.finditer(html):
+        parts.append(NEWLINE_SPACE_RE.sub('\n', html[position:match.start()]))
+        parts.append(match.group(0))
+        position = match.end()
+    parts.append(NEWLINE_SPACE_RE.sub('\n', html[position:]))
+    return ''.join(parts)
+
+
+def content_type(response):
+    return response.get('Content-Type', '').split(';')[0].strip().lower()
+
+
+def is_html(response):
+    return content_type(response) == 'text/html'
+
+
+def is_compressible(response):
+    return content_type(response).startswith(COMPRESSIBLE_TYPES)
+
+
+def accepts_gzip(request):
+    return bool(GZIP_RE.search(request.META.get('HTTP_ACCEPT_ENCODING', '')))
+
+
+def weak_etag(etag):
+    return etag if etag.startswith('W/') else f'W/{etag}'
@@ -0,0 +1,11 @@
+from django.conf import settings
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            if not name.isidentifier():
+                raise ValueError(f'Некорректное имя PRAGMA: {name}')
+            cursor.execute(f'PRAGMA {name} = {value}')
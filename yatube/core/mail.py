@@ -0,0 +1,144 @@
+import base64
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import OutboundEmail, Task
+from .tasks import enqueue, task
+
+
+def dump_attachment(attachment):
+    filename, content, mimetype = attachment
+    if isinstance(content, str):
+        content = content.encode()
+    return [filename, base64.b64encode(content).decode(), mimetype]
+
+
+def to_row(message):
+    if any(not isinstance(item, tuple) for item in message.attachments):
+        raise ValueError('MIME-вложения не поддерживаются очередью писем')
+    return OutboundEmail(
+        subject=message.subject,
+        body=message.body,
+        from_email=message.from_email,
+        to=json.dumps(message.to),
+        cc=json.dumps(message.cc),
+        bcc=json.dumps(message.bcc),
+        reply_to=json.dumps(message.reply_to),
+        headers=json.dumps(message.extra_headers),
+        alternatives=json.dumps(getattr(message, 'alternatives', [])),
+        attachments=json.dumps(
+            [dump_attachment(item) for item in message.attachments]),
+    )
+
+
+def to_message(email, connection=None):
+    return EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email,
+        to=json.loads(email.to),
+        cc=json.loads(email.cc),
+        bcc=json.loads(email.bcc),
+        reply_to=json.loads(email.reply_to),
+        headers=json.loads(email.headers),
+        alternatives=[tuple(item) for item in json.loads(email.alternatives)],
+        attachments=[
+            (filename, base64.b64decode(content), mimetype)
+            for filename, content, mimetype in json.loads(email.attachments)
+        ],
+        connection=connection,
+    )
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    # Письма пишутся в таблицу, отправляет их воркер через
+    # EMAIL_DELIVERY_BACKEND: медленный почтовый сервер не держит запрос.
+    def send_messages(self, email_messages):
+        rows = [to_row(message) for message in email_messages
+                if message.recipients()]
+        if not rows:
+            return 0
+        OutboundEmail.objects.bulk_create(rows)
+        schedule_delivery()
+        return len(rows)
+
+
+def schedule_delivery(countdown=0):
+    # Одной задачи в очереди достаточно, если она запустится не позже
+    # нужного: она заберёт все готовые письма.
+    run_after = timezone.now() + timedelta(seconds=countdown)
+    if not Task.objects.filter(
+        name=deliver_emails.task_name,
+        status=Task.PENDING,
+        run_after__lte=run_after,
+    ).exists():
+        enqueue(deliver_emails.task_name, priority=2, countdown=countdown)
+
+
+def claim(limit):
+    # Письмо забираем условным UPDATE: если его уже взял другой воркер,
+    # строка не обновится. send_after на время отправки сдвигается на
+    # TASK_LOCK_TIMEOUT, после чего письмо упавшего воркера снова доступно.
+    now = timezone.now()
+    ready = OutboundEmail.objects.filter(
+        Q(status=OutboundEmail.PENDING) | Q(status=OutboundEmail.SENDING),
+        send_after__lte=now,
+    )
+    claimed = []
+    for pk, status in ready.values_list('pk', 'status')[:limit]:
+        if OutboundEmail.objects.filter(
+            pk=pk, status=status, send_after__lte=now,
+        ).update(
+            status=OutboundEmail.SENDING,
+            send_after=now + timedelta(seconds=settings.TASK_LOCK_TIMEOUT),
+        ):
+            claimed.append(pk)
+    return list(OutboundEmail.objects.filter(pk__in=claimed))
+
+
+@task(priority=2)
+def deliver_emails():
+    # Одно соединение на пачку писем; ошибка одного письма не мешает
+    # остальным, оно уходит на повтор с растущей задержкой.
+    connection = get_connection(settings.EMAIL_DELIVERY_BACKEND)
+    connection.open()
+    try:
+        while True:
+            batch = claim(settings.EMAIL_BATCH_SIZE)
+            if not batch:
+                break
+            for email in batch:
+                deliver(email, connection)
+    finally:
+        connection.close()
+    retry = OutboundEmail.objects.filter(
+        status__in=(OutboundEmail.PENDING, OutboundEmail.SENDING),
+    ).order_by('send_after').first()
+    if retry is not None:
+        schedule_delivery(countdown=max(
+            0, (retry.send_after - timezone.now()).total_seconds()))
+
+
+def deliver(email, connection):
+    email.attempts += 1
+    try:
+        connection.send_messages([to_message(email, connection)])
+    except Exception as error:
+        email.last_error = repr(error)
+        if email.attempts >= settings.EMAIL_MAX_ATTEMPTS:
+            email.status = OutboundEmail.FAILED
+        else:
+            email.status = OutboundEmail.PENDING
+            backoff = settings.TASK_RETRY_BACKOFF * 2 ** (email.attempts - 1)
+            email.send_after = timezone.now() + timedelta(seconds=backoff)
+    else:
+        email.status = OutboundEmail.SENT
+        email.sent_at = timezone.now()
+    email.save(update_fields=(
+        'status', 'attempts', 'send_after', 'last_error', 'sent_at'))
@@ -0,0 +1,72 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils.text import compress_string
+
+from core.compression import minify
+from posts.models import Group, Post, User
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает размер страниц ленты на проводе и затраты CPU на '
+        'минификацию и gzip. Тестовые данные откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=30)
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            group, author = self.prepare(options['posts'])
+            urls = (
+                reverse('posts:index_page'),
+                reverse('posts:group_list', kwargs={'slug': group.slug}),
+                reverse('posts:profile',
+                        kwargs={'username': author.username}),
+                reverse('posts:trending'),
+            )
+            with override_settings(COMPRESSION_ENABLED=False):
+                client = Client()
+                pages = [(url, client.get(url).content) for url in urls]
+            transaction.set_rollback(True)
+        self.stdout.write(
+            f'{"страница":<32}{"байт":>8}{"мин.":>8}{"gzip":>8}'
+            f'{"мин.+gzip":>10}{"CPU мин.":>10}{"CPU gzip":>10}'
+        )
+        for url, raw in pages:
+            minified = minify(raw.decode()).encode()
+            minify_cpu = self.cpu(
+                lambda: minify(raw.decode()), options['repeat'])
+            gzip_cpu = self.cpu(
+                lambda: compress_string(minified), options['repeat'])
+            self.stdout.write(
+                f'{url:<32}{len(raw):>8}{len(minified):>8}'
+                f'{len(compress_string(raw)):>8}'
+                f'{len(compress_string(minified)):>10}'
+                f'{minify_cpu * 1000:>8.2f}мс{gzip_cpu * 1000:>8.2f}мс'
+            )
+
+    def cpu(self, func, repeat):
+        started = time.process_time()
+        for _ in range(repeat):
+            func()
+        return (time.process_time() - started) / repeat
+
+    def prepare(self, count):
+        group = Group.objects.create(
+            title='Bench', slug='bench-compression', description='Bench')
+        author = User.objects.create_user(
+            username='bench_compression', first_name='Bench',
+            last_name='Author')
+        for i in range(count):
+            Post.objects.create(
+                author=author,
+                group=group,
+                text=f'Bench post {i}\nвторая строка ' * 10,
+            )
+        return group, author
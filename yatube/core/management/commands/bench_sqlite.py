@@ -0,0 +1,118 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+SCHEMA = (
+    'CREATE TABLE post (id INTEGER PRIMARY KEY, author_id INTEGER, '
+    'text TEXT, pub_date REAL)',
+    'CREATE INDEX post_pub_date ON post (pub_date)',
+    'CREATE TABLE comment (id INTEGER PRIMARY KEY, post_id INTEGER, '
+    'author_id INTEGER, text TEXT, created REAL)',
+    'CREATE INDEX comment_post_id ON comment (post_id)',
+)
+READ_SQL = (
+    'SELECT p.id, p.text, p.pub_date, COUNT(c.id) FROM post p '
+    'LEFT JOIN comment c ON c.post_id = p.id '
+    'GROUP BY p.id ORDER BY p.pub_date DESC LIMIT 10'
+)
+WRITE_SQL = (
+    'INSERT INTO comment (post_id, author_id, text, created) '
+    'VALUES (?, ?, ?, ?)'
+)
+# Таймаут, с которым Django открывает SQLite, если OPTIONS его не задают.
+DEFAULT_TIMEOUT = 5
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность SQLite с настройками по '
+        'умолчанию и с SQLITE_PRAGMAS при конкурентных чтениях и записях.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=3)
+        parser.add_argument('--write-ratio', type=float, default=0.2)
+        parser.add_argument('--posts', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        modes = (
+            ('defaults', {}),
+            ('tuned', settings.SQLITE_PRAGMAS),
+        )
+        for name, pragmas in modes:
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'bench.sqlite3')
+                self.prepare(path, pragmas, options['posts'])
+                stats = self.run(path, pragmas, options)
+            seconds = options['seconds']
+            self.stdout.write(
+                f'{name:>8}: reads {stats["reads"] / seconds:>9.0f}/s  '
+                f'writes {stats["writes"] / seconds:>8.0f}/s  '
+                f'locked {stats["locked"]}'
+            )
+
+    def connect(self, path, pragmas):
+        # Без настроек ждём блокировку, как Django по умолчанию; с ними
+        # ожидание задаётся только через busy_timeout.
+        timeout = 0 if 'busy_timeout' in pragmas else DEFAULT_TIMEOUT
+        connection = sqlite3.connect(
+            path, timeout=timeout, isolation_level=None,
+            check_same_thread=False)
+        for name, value in pragmas.items():
+            connection.execute(f'PRAGMA {name} = {value}')
+        return connection
+
+    def prepare(self, path, pragmas, posts):
+        connection = self.connect(path, pragmas)
+        for statement in SCHEMA:
+            connection.execute(statement)
+        connection.executemany(
+            'INSERT INTO post (author_id, text, pub_date) VALUES (?, ?, ?)',
+            ((i % 50, 'text ' * 40, i) for i in range(posts)),
+        )
+        connection.close()
+
+    def run(self, path, pragmas, options):
+        stats = {'reads': 0, 'writes': 0, 'locked': 0}
+        lock = threading.Lock()
+        deadline = time.monotonic() + options['seconds']
+        every = round(1 / options['write_ratio']) if options[
+            'write_ratio'] else 0
+
+        def worker(number):
+            connection = self.connect(path, pragmas)
+            local = {'reads': 0, 'writes': 0, 'locked': 0}
+            step = 0
+            while time.monotonic() < deadline:
+                step += 1
+                try:
+                    if every and step % every == 0:
+                        connection.execute(
+                            WRITE_SQL, (step % options['posts'] + 1, number,
+                                        'comment', time.time()))
+                        local['writes'] += 1
+                    else:
+                        connection.execute(READ_SQL).fetchall()
+                        local['reads'] += 1
+                except sqlite3.OperationalError:
+                    local['locked'] += 1
+            connection.close()
+            with lock:
+                for key, value in local.items():
+                    stats[key] += value
+
+        threads = [
+            threading.Thread(target=worker, args=(number,))
+            for number in range(options['workers'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return stats
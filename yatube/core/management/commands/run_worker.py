@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from core.tasks import run_worker
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=1)
+        parser.add_argument('--poll-interval', type=float)
+        parser.add_argument(
+            '--until-empty', action='store_true',
+            help='Завершиться, когда очередь опустеет.')
+
+    def handle(self, *args, **options):
+        processed = run_worker(
+            concurrency=options['concurrency'],
+            until_empty=options['until_empty'],
+            poll_interval=options['poll_interval'],
+        )
+        self.stdout.write(f'Выполнено задач: {processed}.')
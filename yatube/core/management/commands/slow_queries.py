@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from core.models import SlowQuery
+from core.slowlog import top
+
+ORDERING = {
+    'total': '-total_time',
+    'avg': '-avg',
+    'max': '-max_time',
+    'count': '-count',
+}
+
+
+class Command(BaseCommand):
+    help = 'Показывает самые медленные SQL-запросы.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument(
+            '--order', choices=ORDERING, default='total')
+        parser.add_argument(
+            '--plan', action='store_true', help='Вывести план запроса.')
+        parser.add_argument(
+            '--reset', action='store_true', help='Очистить журнал.')
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            SlowQuery.objects.all().delete()
+            return
+        for query in top(ORDERING[options['order']], options['limit']):
+            self.stdout.write(
+                f'{query.count:>6} total={query.total_time:.1f}ms '
+                f'avg={query.avg:.1f}ms max={query.max_time:.1f}ms '
+                f'[{query.view or "-"}]'
+            )
+            self.stdout.write(f'    {query.sql}')
+            if options['plan'] and query.plan:
+                for line in query.plan.splitlines():
+                    self.stdout.write(f'      {line}')
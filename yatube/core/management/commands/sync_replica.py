@@ -0,0 +1,49 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.routers import mark_synced
+
+
+class Command(BaseCommand):
+    help = 'Копирует основную базу SQLite в файл реплики.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Повторять копирование каждые N секунд; без этого '
+                 'реплика перестаёт читаться через REPLICA_MAX_LAG.')
+        parser.add_argument('--pages', type=int, default=256)
+
+    def handle(self, *args, **options):
+        alias = settings.REPLICA_DATABASE
+        if not alias or alias not in connections.databases:
+            raise CommandError('Реплика не настроена.')
+        primary = connections.databases[DEFAULT_DB_ALIAS]['NAME']
+        replica = connections.databases[alias]['NAME']
+        while True:
+            started = time.monotonic()
+            synced = time.time()
+            self.copy(primary, replica, options['pages'])
+            mark_synced(replica, synced)
+            self.stdout.write(
+                f'{replica} обновлена за '
+                f'{(time.monotonic() - started) * 1000:.0f} мс'
+            )
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
+
+    def copy(self, primary, replica, pages):
+        # Тестовая основная база — общая база в памяти, открытая по URI.
+        source = sqlite3.connect(primary, uri=primary.startswith('file:'))
+        target = sqlite3.connect(replica, timeout=30)
+        try:
+            # Копируем порциями, чтобы не держать блокировку на всё время.
+            source.backup(target, pages=pages)
+        finally:
+            target.close()
+            source.close()
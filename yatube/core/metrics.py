@@ -0,0 +1,295 @@
+import fcntl
+import json
+import os
+import threading
+import time
+
+from django.conf import settings
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+ARCHIVE = 'archive.json'
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+
+    def key(self, labels):
+        return json.dumps([str(labels[name]) for name in self.labelnames])
+
+    def dump(self):
+        return {
+            'kind': self.kind,
+            'help': self.documentation,
+            'labelnames': self.labelnames,
+            'values': self.values,
+        }
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self.key(labels)
+        with self.registry.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+        self.registry.maybe_flush()
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def inc(self, amount=1, **labels):
+        key = self.key(labels)
+        with self.registry.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        with self.registry.lock:
+            self.values[self.key(labels)] = value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, *args, buckets=DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self.key(labels)
+        with self.registry.lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = {
+                    'buckets': [0] * len(self.buckets),
+                    'sum': 0.0,
+                    'count': 0,
+                }
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state['buckets'][index] += 1
+            state['sum'] += value
+            state['count'] += 1
+        self.registry.maybe_flush()
+
+    def dump(self):
+        dumped = super().dump()
+        dumped['buckets'] = self.buckets
+        return dumped
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+        self.last_flush = time.monotonic()
+
+    def register(self, metric_class, name, documentation, labelnames=(),
+                 **kwargs):
+        if name not in self.metrics:
+            self.metrics[name] = metric_class(
+                self, name, documentation, labelnames, **kwargs)
+        return self.metrics[name]
+
+    def counter(self, *args, **kwargs):
+        return self.register(Counter, *args, **kwargs)
+
+    def gauge(self, *args, **kwargs):
+        return self.register(Gauge, *args, **kwargs)
+
+    def histogram(self, *args, **kwargs):
+        return self.register(Histogram, *args, **kwargs)
+
+    def path(self, pid=None):
+        return os.path.join(settings.METRICS_DIR, f'{pid or os.getpid()}.json')
+
+    def maybe_flush(self):
+        elapsed = time.monotonic() - self.last_flush
+        if elapsed >= settings.METRICS_FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            self.last_flush = time.monotonic()
+            dumped = {
+                name: metric.dump() for name, metric in self.metrics.items()
+            }
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        _write(self.path(), dumped)
+
+    def prune(self):
+        # Файлы завершившихся процессов сливаем в общий архив и удаляем,
+        # иначе с каждым перезапуском воркеров их становится больше.
+        # Gauge умерших процессов в архив не попадают.
+        archive_path = os.path.join(settings.METRICS_DIR, ARCHIVE)
+        archive = _read(archive_path) or {}
+        dead = [
+            path for pid, path in _pid_files() if not _is_alive(pid)
+        ]
+        for path in dead:
+            _merge_dump(archive, _read(path) or {}, alive=False)
+        if dead:
+            _write(archive_path, archive)
+        for path in dead:
+            os.remove(path)
+        return archive
+
+    def collect(self):
+        self.flush()
+        # Блокировка не даёт двум сборщикам слить один файл дважды.
+        lock_path = os.path.join(settings.METRICS_DIR, '.lock')
+        with open(lock_path, 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            archive = self.prune()
+            merged = {}
+            _merge_dump(merged, archive)
+            for _, path in _pid_files():
+                _merge_dump(merged, _read(path) or {})
+        return merged
+
+    def exposition(self):
+        lines = []
+        for name, metric in sorted(self.collect().items()):
+            lines.append(f'# HELP {name} {metric["help"]}')
+            lines.append(f'# TYPE {name} {metric["kind"]}')
+            for key, value in sorted(metric['values'].items()):
+                labels = list(zip(metric['labelnames'], json.loads(key)))
+                if metric['kind'] != 'histogram':
+                    lines.append(f'{name}{_labels(labels)} {value}')
+                    continue
+                buckets = zip(metric['buckets'], value['buckets'])
+                for bound, count in buckets:
+                    bucket_labels = _labels(labels + [('le', bound)])
+                    lines.append(f'{name}_bucket{bucket_labels} {count}')
+                inf_labels = _labels(labels + [('le', '+Inf')])
+                lines.append(f'{name}_bucket{inf_labels} {value["count"]}')
+                lines.append(f'{name}_sum{_labels(labels)} {value["sum"]}')
+                lines.append(
+                    f'{name}_count{_labels(labels)} {value["count"]}')
+        return '\n'.join(lines) + '\n'
+
+
+def _pid_files():
+    for filename in sorted(os.listdir(settings.METRICS_DIR)):
+        pid, extension = os.path.splitext(filename)
+        if extension == '.json' and pid.isdigit():
+            yield int(pid), os.path.join(settings.METRICS_DIR, filename)
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write(path, dumped):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as tmp:
+        json.dump(dumped, tmp)
+    os.replace(tmp_path, path)
+
+
+def _merge_dump(merged, dumped, alive=True):
+    for name, metric in dumped.items():
+        if metric['kind'] == 'gauge' and not alive:
+            continue
+        target = merged.setdefault(name, dict(metric, values={}))
+        for key, value in metric['values'].items():
+            target['values'][key] = _merge(target['values'].get(key), value)
+
+
+def _is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _merge(current, value):
+    if current is None:
+        return value
+    if isinstance(value, dict):
+        return {
+            'buckets': [a + b for a, b in zip(
+                current['buckets'], value['buckets'])],
+            'sum': current['sum'] + value['sum'],
+            'count': current['count'] + value['count'],
+        }
+    return current + value
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\')
+                         .replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels
+    )
+    return f'{{{pairs}}}'
+
+
+registry = Registry()
+
+requests_total = registry.counter(
+    'yatube_http_requests_total',
+    'Обработанные запросы.',
+    ('view', 'method', 'status'),
+)
+request_exceptions_total = registry.counter(
+    'yatube_http_request_exceptions_total',
+    'Запросы, завершившиеся необработанным исключением.',
+    ('view',),
+)
+requests_in_progress = registry.gauge(
+    'yatube_http_requests_in_progress',
+    'Запросы в обработке.',
+)
+request_duration = registry.histogram(
+    'yatube_http_request_duration_seconds',
+    'Время обработки запроса.',
+    ('view',),
+)
+db_query_duration = registry.histogram(
+    'yatube_db_query_duration_seconds',
+    'Время выполнения SQL-запросов.',
+    ('alias',),
+)
+cache_requests_total = registry.counter(
+    'yatube_cache_requests_total',
+    'Чтения из кеша.',
+    ('result',),
+)
+thumbnail_duration = registry.histogram(
+    'yatube_thumbnail_duration_seconds',
+    'Время генерации превью.',
+)
+
+# Замеры, которые нужны observe_timing.
+TIMED_KINDS = ('db', 'cache', 'thumbnail')
+
+
+def observe_timing(kind, duration, **extra):
+    if kind == 'db':
+        db_query_duration.observe(duration, alias=extra['alias'])
+    elif kind == 'cache' and extra.get('operation') == 'get':
+        cache_requests_total.inc(result='hit' if extra['hit'] else 'miss')
+    elif kind == 'thumbnail':
+        thumbnail_duration.observe(duration)
@@ -0,0 +1,231 @@
+import json
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.utils.cache import (
+    get_conditional_response, patch_vary_headers, set_response_etag)
+from django.utils.text import compress_sequence, compress_string
+
+from . import (
+    chrome, compression, metrics, profiling, ratelimit, routers, slowlog)
+
+logger = logging.getLogger('yatube.profiling')
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        profiling.install()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        with profiling.collect() as timings:
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+        response['Server-Timing'] = profiling.server_timing(timings, total)
+        if random.random() < settings.PROFILING_LOG_SAMPLE_RATE:
+            match = request.resolver_match
+            logger.info(json.dumps({
+                'view': match.view_name if match else None,
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'total_ms': round(total * 1000, 2),
+                'timings': {
+                    kind: {'count': count, 'ms': round(duration * 1000, 2)}
+                    for kind, (count, duration) in timings.items()
+                },
+            }))
+        return response
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        profiling.add_listener(
+            metrics.observe_timing, metrics.TIMED_KINDS)
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics.requests_in_progress.inc()
+        started = time.perf_counter()
+        try:
+            with profiling.collect():
+                response = self.get_response(request)
+        finally:
+            metrics.requests_in_progress.dec()
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        metrics.request_duration.observe(
+            time.perf_counter() - started, view=view)
+        metrics.requests_total.inc(
+            view=view, method=request.method, status=response.status_code)
+        return response
+
+    def process_exception(self, request, exception):
+        match = request.resolver_match
+        metrics.request_exceptions_total.inc(
+            view=match.view_name if match else 'unresolved')
+
+
+class SlowQueryMiddleware:
+    def __init__(self, get_response):
+        if settings.SLOW_QUERY_THRESHOLD_MS is None:
+            raise MiddlewareNotUsed
+        profiling.add_listener(slowlog.observe_timing)
+        self.get_response = get_response
+
+    def __call__(self, request):
+        slowlog.start()
+        try:
+            with profiling.collect():
+                response = self.get_response(request)
+        finally:
+            slowlog.finish()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        slowlog.set_view(request.resolver_match.view_name)
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        if not settings.REPLICA_DATABASE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        finally:
+            routers.use_replica(False)
+        match = request.resolver_match
+        if (request.method not in ('GET', 'HEAD')
+                or match and match.view_name in settings.REPLICA_WRITE_VIEWS):
+            response.set_cookie(
+                routers.PIN_COOKIE, '1',
+                max_age=settings.REPLICA_PIN_SECONDS, httponly=True)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        routers.use_replica(
+            request.method in ('GET', 'HEAD')
+            and request.resolver_match.view_name in settings.REPLICA_READ_VIEWS
+            and routers.PIN_COOKIE not in request.COOKIES
+            and routers.replica_ready()
+        )
+
+
+class RateLimitMiddleware:
+    def __init__(self, get_response):
+        if not settings.RATELIMITS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        name = request.resolver_match.view_name
+        rates = settings.RATELIMITS.get(name)
+        if rates is None:
+            return None
+        retry_after = ratelimit.check(
+            request, name, rates, rates.get('methods'))
+        if retry_after:
+            return ratelimit.too_many_requests(retry_after)
+        return None
+
+
+class SplitChromeMiddleware:
+    def __init__(self, get_response):
+        if not settings.SPLIT_CHROME_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not getattr(request, 'split_chrome', False) or response.streaming:
+            return response
+        content = response.content.decode(response.charset)
+        # Тело с CSRF-токеном персонально, такое в общий кеш не кладём.
+        if (response.status_code == 200
+                and not getattr(request, 'chrome_cached', False)
+                and not request.META.get('CSRF_COOKIE_USED')):
+            cache.set(chrome.body_key(request), content,
+                      settings.SPLIT_CHROME_TIMEOUT)
+        response.content = chrome.splice(request, content)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (request.method != 'GET' or request.resolver_match.view_name
+                not in settings.SPLIT_CHROME_VIEWS):
+            return None
+        request.split_chrome = True
+        content = cache.get(chrome.body_key(request))
+        if content is None:
+            return None
+        request.chrome_cached = True
+        return HttpResponse(content)
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        if not settings.COMPRESSION_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (response.has_header('Content-Encoding')
+                or not compression.is_compressible(response)):
+            return response
+        if response.streaming:
+            return self.compress_stream(request, response)
+        if compression.is_html(response):
+            response.content = compression.minify(
+                response.content.decode(response.charset))
+            response['Content-Length'] = len(response.content)
+        if request.method in ('GET', 'HEAD') and response.status_code == 200:
+            # Тег слабый: сжатое и несжатое представления отличаются
+            # байтами, но равнозначны по смыслу.
+            if not response.has_header('ETag'):
+                set_response_etag(response)
+            response['ETag'] = compression.weak_etag(response['ETag'])
+            response = get_conditional_response(
+                request, etag=response['ETag'], response=response)
+        if len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        # Страницы с CSRF-токеном не сжимаем: защита от BREACH.
+        if (not compression.accepts_gzip(request)
+                or request.META.get('CSRF_COOKIE_USED')):
+            return response
+        compressed = compress_string(response.content)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response['Content-Length'] = len(compressed)
+        response['Content-Encoding'] = 'gzip'
+        return response
+
+    def compress_stream(self, request, response):
+        # Поток не минифицируем: теги могут разрываться между кусками.
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if not compression.accepts_gzip(request):
+            return response
+        response.streaming_content = compress_sequence(
+            response.streaming_content)
+        if response.has_header('ETag'):
+            response['ETag'] = compression.weak_etag(response['ETag'])
+        del response['Content-Length']
+        response['Content-Encoding'] = 'gzip'
+        return response
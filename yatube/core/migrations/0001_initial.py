@@ -0,0 +1,33 @@
+# Generated by Django 2.2.16 on 2026-10-19 19:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=40, unique=True)),
+                ('sql', models.TextField(verbose_name='Нормализованный SQL')),
+                ('view', models.CharField(blank=True, max_length=200, verbose_name='Представление')),
+                ('plan', models.TextField(blank=True, verbose_name='План запроса')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Количество')),
+                ('total_time', models.FloatField(default=0, verbose_name='Общее время, мс')),
+                ('max_time', models.FloatField(default=0, verbose_name='Максимальное время, мс')),
+                ('last_seen', models.DateTimeField(auto_now=True, verbose_name='Последний раз')),
+            ],
+            options={
+                'verbose_name': 'Медленный запрос',
+                'verbose_name_plural': 'Медленные запросы',
+                'ordering': ('-total_time',),
+            },
+        ),
+    ]
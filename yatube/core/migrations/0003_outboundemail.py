@@ -0,0 +1,45 @@
+# Generated by Django 2.2.16 on 2026-10-19 20:02
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_task'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboundEmail',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.TextField(verbose_name='Тема')),
+                ('body', models.TextField(verbose_name='Текст')),
+                ('from_email', models.CharField(max_length=254, verbose_name='Отправитель')),
+                ('to', models.TextField(default='[]', verbose_name='Получатели')),
+                ('cc', models.TextField(default='[]', verbose_name='Копия')),
+                ('bcc', models.TextField(default='[]', verbose_name='Скрытая копия')),
+                ('reply_to', models.TextField(default='[]', verbose_name='Ответить')),
+                ('headers', models.TextField(default='{}', verbose_name='Заголовки')),
+                ('alternatives', models.TextField(default='[]', verbose_name='Альтернативы')),
+                ('attachments', models.TextField(default='[]', verbose_name='Вложения')),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('sent', 'Отправлено'), ('failed', 'Ошибка')], default='pending', max_length=16, verbose_name='Статус')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Попытки')),
+                ('send_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Не раньше')),
+                ('last_error', models.TextField(blank=True, verbose_name='Последняя ошибка')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Создано')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Отправлено')),
+            ],
+            options={
+                'verbose_name': 'Исходящее письмо',
+                'verbose_name_plural': 'Исходящие письма',
+                'ordering': ('pk',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='outboundemail',
+            index=models.Index(fields=['status', 'send_after'], name='outbound_email_queue'),
+        ),
+    ]
@@ -0,0 +1,105 @@
+from django.db import models
+from django.utils import timezone
+
+
+class SlowQuery(models.Model):
+    fingerprint = models.CharField(max_length=40, unique=True)
+    sql = models.TextField('Нормализованный SQL')
+    view = models.CharField('Представление', max_length=200, blank=True)
+    plan = models.TextField('План запроса', blank=True)
+    count = models.PositiveIntegerField('Количество', default=0)
+    total_time = models.FloatField('Общее время, мс', default=0)
+    max_time = models.FloatField('Максимальное время, мс', default=0)
+    last_seen = models.DateTimeField('Последний раз', auto_now=True)
+
+    class Meta:
+        ordering = ('-total_time',)
+        verbose_name = 'Медленный запрос'
+        verbose_name_plural = 'Медленные запросы'
+
+    def __str__(self) -> str:
+        return f'{self.sql[:50]}'
+
+    @property
+    def avg_time(self):
+        return self.total_time / self.count if self.count else 0
+
+
+class Task(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Готово'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField('Задача', max_length=200)
+    args = models.TextField('Аргументы', default='[]')
+    kwargs = models.TextField('Именованные аргументы', default='{}')
+    priority = models.SmallIntegerField('Приоритет', default=0)
+    status = models.CharField(
+        'Статус', max_length=16, choices=STATUSES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField('Попытки', default=0)
+    max_attempts = models.PositiveSmallIntegerField(
+        'Максимум попыток', default=3)
+    run_after = models.DateTimeField('Не раньше')
+    locked_at = models.DateTimeField('Взята в работу', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created = models.DateTimeField('Создана', auto_now_add=True)
+    updated = models.DateTimeField('Обновлена', auto_now=True)
+
+    class Meta:
+        ordering = ('-priority', 'run_after', 'pk')
+        verbose_name = 'Фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        indexes = [models.Index(
+            fields=['status', '-priority', 'run_after'],
+            name='task_queue')]
+
+    def __str__(self) -> str:
+        return f'{self.name} №{self.pk}'
+
+
+class OutboundEmail(models.Model):
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (SENDING, 'Отправляется'),
+        (SENT, 'Отправлено'),
+        (FAILED, 'Ошибка'),
+    )
+
+    subject = models.TextField('Тема')
+    body = models.TextField('Текст')
+    from_email = models.CharField('Отправитель', max_length=254)
+    to = models.TextField('Получатели', default='[]')
+    cc = models.TextField('Копия', default='[]')
+    bcc = models.TextField('Скрытая копия', default='[]')
+    reply_to = models.TextField('Ответить', default='[]')
+    headers = models.TextField('Заголовки', default='{}')
+    alternatives = models.TextField('Альтернативы', default='[]')
+    attachments = models.TextField('Вложения', default='[]')
+    status = models.CharField(
+        'Статус', max_length=16, choices=STATUSES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField('Попытки', default=0)
+    send_after = models.DateTimeField('Не раньше', default=timezone.now)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+
+    class Meta:
+        ordering = ('pk',)
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = [models.Index(
+            fields=['status', 'send_after'], name='outbound_email_queue')]
+
+    def __str__(self) -> str:
+        return f'{self.subject[:50]}'
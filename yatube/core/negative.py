@@ -0,0 +1,38 @@
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404, HttpResponseNotFound
+from django.template.loader import render_to_string
+
+
+class KnownMissing(Http404):
+    # Промах уже был недавно: отвечаем статической страницей, не трогая
+    # ни базу, ни шаблоны с данными пользователя.
+    pass
+
+
+def missing_key(kind, value):
+    return f'missing:{kind}:{value}'
+
+
+def check(kind, value):
+    if cache.get(missing_key(kind, value)):
+        raise KnownMissing
+
+
+def remember(kind, value):
+    cache.set(missing_key(kind, value), True, settings.NEGATIVE_CACHE_TIMEOUT)
+
+
+def forget(kind, value):
+    cache.delete(missing_key(kind, value))
+
+
+@lru_cache(maxsize=None)
+def static_page():
+    return render_to_string('core/404_static.html').encode()
+
+
+def static_not_found():
+    return HttpResponseNotFound(static_page())
@@ -0,0 +1,150 @@
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.template.base import Template
+
+CACHE_METHODS = (
+    'get', 'set', 'add', 'delete', 'get_many', 'set_many', 'delete_many',
+    'incr', 'decr',
+)
+
+_state = threading.local()
+_listeners = []
+_lock = threading.Lock()
+# Замеры, которые требуют подмены методов; SQL замеряется через
+# execute_wrapper внутри collect() и в установке не нуждается.
+PATCHED_KINDS = ('template', 'cache', 'thumbnail')
+_installed = set()
+
+
+def add_listener(listener, kinds=('db',)):
+    # Подменяем только то, что нужно слушателю.
+    install(kinds)
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def record(kind, duration, **extra):
+    timings = getattr(_state, 'timings', None)
+    if timings is not None:
+        count, total = timings.get(kind, (0, 0.0))
+        timings[kind] = (count + 1, total + duration)
+    for listener in _listeners:
+        listener(kind, duration, **extra)
+
+
+def _sql_wrapper(execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        record(
+            'db',
+            time.perf_counter() - started,
+            sql=sql,
+            params=params,
+            many=many,
+            alias=context['connection'].alias,
+        )
+
+
+@contextmanager
+def collect():
+    if getattr(_state, 'timings', None) is not None:
+        yield _state.timings
+        return
+    _state.timings = timings = {}
+    _state.depth = 0
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(_sql_wrapper))
+            yield timings
+    finally:
+        _state.timings = None
+
+
+def _timed_template_render(render):
+    def wrapper(self, context):
+        depth = getattr(_state, 'depth', 0)
+        _state.depth = depth + 1
+        started = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            _state.depth = depth
+            if not depth:
+                record('template', time.perf_counter() - started)
+    return wrapper
+
+
+def _timed_cache_call(method, name):
+    def wrapper(self, *args, **kwargs):
+        started = time.perf_counter()
+        result = method(self, *args, **kwargs)
+        extra = {'operation': name}
+        if name == 'get':
+            extra['hit'] = result is not None
+        record('cache', time.perf_counter() - started, **extra)
+        return result
+    return wrapper
+
+
+def _timed_thumbnail(get_thumbnail):
+    def wrapper(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return get_thumbnail(self, *args, **kwargs)
+        finally:
+            record('thumbnail', time.perf_counter() - started)
+    return wrapper
+
+
+def _install_template():
+    Template.render = _timed_template_render(Template.render)
+
+
+def _install_cache():
+    patched = set()
+    for alias in settings.CACHES:
+        backend = type(caches[alias])
+        if backend in patched:
+            continue
+        for name in CACHE_METHODS:
+            setattr(backend, name,
+                    _timed_cache_call(getattr(backend, name), name))
+        patched.add(backend)
+
+
+def _install_thumbnail():
+    from sorl.thumbnail.base import ThumbnailBackend
+    ThumbnailBackend.get_thumbnail = _timed_thumbnail(
+        ThumbnailBackend.get_thumbnail)
+
+
+_PATCHES = {
+    'template': _install_template,
+    'cache': _install_cache,
+    'thumbnail': _install_thumbnail,
+}
+
+
+def install(kinds=PATCHED_KINDS):
+    with _lock:
+        for kind in kinds:
+            if kind in _PATCHES and kind not in _installed:
+                _PATCHES[kind]()
+                _installed.add(kind)
+
+
+def server_timing(timings, total):
+    metrics = []
+    for kind, (count, duration) in sorted(timings.items()):
+        metrics.append(
+            f'{kind};dur={duration * 1000:.2f};desc="{count}"')
+    metrics.append(f'total;dur={total * 1000:.2f}')
+    return ', '.join(metrics)
@@ -0,0 +1,110 @@
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+RATE_PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 60 * 60 * 24}
+
+
+def parse_rate(rate):
+    limit, _, period = rate.partition('/')
+    return int(limit), RATE_PERIODS[period]
+
+
+def incr(cache, key, timeout):
+    if cache.add(key, 1, timeout):
+        return 1
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout)
+        return 1
+
+
+def wait_time(previous, current, limit, period, elapsed):
+    # Через сколько секунд оценка опустится до limit - 1 и следующий
+    # запрос пройдёт.
+    if current < limit:
+        ready = period * (1 - (limit - current - 1) / previous)
+    else:
+        # В текущем окне места нет: ждём следующего, где нынешний
+        # счётчик станет предыдущим.
+        ready = period * (2 - (limit - 1) / current)
+    return max(ready - elapsed, 0)
+
+
+def consume(key, rate, now=None):
+    # Скользящее окно из двух счётчиков: число запросов за последние
+    # period секунд оценивается как счётчик текущего окна плюс доля
+    # предыдущего, пропорциональная ещё не истёкшей его части. В отличие
+    # от фиксированного окна это не даёт пропустить 2 * limit запросов
+    # подряд на стыке окон. add, incr и decr атомарны в memcached, Redis
+    # и LocMemCache; в файловом кеше и кеше в базе incr — это get и set,
+    # и параллельные запросы могут недосчитаться. Счётчики живут в кеше
+    # RATELIMIT_CACHE: если он локальный для процесса (LocMemCache), лимит
+    # действует на каждый процесс отдельно и фактически умножается на
+    # число воркеров.
+    # Возвращает, сколько секунд ждать до следующего запроса (0 — можно).
+    cache = caches[settings.RATELIMIT_CACHE]
+    limit, period = parse_rate(rate)
+    now = time.time() if now is None else now
+    window, elapsed = divmod(now, period)
+    current_key = f'ratelimit:{key}:{int(window)}'
+    # Счётчик нужен и в следующем окне как предыдущий.
+    current = incr(cache, current_key, 2 * period)
+    previous = cache.get(f'ratelimit:{key}:{int(window) - 1}', 0)
+    if previous * (1 - elapsed / period) + current <= limit:
+        return 0
+    # Отклонённый запрос лимит не расходует.
+    try:
+        cache.decr(current_key)
+    except ValueError:
+        pass
+    return wait_time(previous, current - 1, limit, period, elapsed)
+
+
+def client_keys(request):
+    yield 'ip', request.META.get('REMOTE_ADDR', '')
+    if request.user.is_authenticated:
+        yield 'user', request.user.pk
+
+
+def check(request, name, rates, methods=None):
+    if methods and request.method not in methods:
+        return 0
+    retry_after = 0
+    for scope, ident in client_keys(request):
+        rate = rates.get(scope)
+        if rate:
+            retry_after = max(
+                retry_after, consume(f'{name}:{scope}:{ident}', rate))
+    return retry_after
+
+
+def too_many_requests(retry_after):
+    response = HttpResponse(
+        'Слишком много запросов. Попробуйте позже.',
+        content_type='text/plain; charset=utf-8',
+        status=429,
+    )
+    response['Retry-After'] = max(1, math.ceil(retry_after))
+    return response
+
+
+def ratelimit(user=None, ip=None, methods=None, name=None):
+    rates = {'user': user, 'ip': ip}
+
+    def decorator(view):
+        key = name or f'{view.__module__}.{view.__qualname__}'
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            retry_after = check(request, key, rates, methods)
+            if retry_after:
+                return too_many_requests(retry_after)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,63 @@
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_COOKIE = 'replica_pin'
+
+_state = threading.local()
+
+
+def use_replica(enabled):
+    _state.replica = enabled
+
+
+def sync_stamp(name):
+    # Время изменения файла — момент, на который скопированы данные.
+    return f'{name}.synced'
+
+
+def mark_synced(name, started):
+    with open(sync_stamp(name), 'a'):
+        pass
+    os.utime(sync_stamp(name), (started, started))
+
+
+def replica_ready():
+    alias = settings.REPLICA_DATABASE
+    if not alias or alias not in connections.databases:
+        return False
+    replica = connections.databases[alias]
+    primary = connections.databases[DEFAULT_DB_ALIAS]
+    if replica['NAME'] == primary['NAME']:
+        return False
+    if replica['ENGINE'] != 'django.db.backends.sqlite3':
+        return True
+    # Копия SQLite отстаёт на время с последней синхронизации: слишком
+    # старую не читаем, как и отсутствующую.
+    try:
+        synced = os.path.getmtime(sync_stamp(replica['NAME']))
+    except OSError:
+        return False
+    return time.time() - synced <= settings.REPLICA_MAX_LAG
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        # Сессии и пользователи читаются лениво внутри представления:
+        # с отстающей копии только что вошедший выглядел бы анонимом.
+        if (getattr(_state, 'replica', False)
+                and model._meta.app_label not in settings.PRIMARY_ONLY_APPS):
+            return settings.REPLICA_DATABASE
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
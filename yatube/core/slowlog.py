@@ -0,0 +1,122 @@
+import hashlib
+import logging
+import re
+import threading
+
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db import IntegrityError, connections, transaction
+from django.db.models import ExpressionWrapper, F, FloatField, Value
+from django.db.models.functions import Greatest
+from django.dispatch import receiver
+
+from .models import SlowQuery
+
+logger = logging.getLogger('yatube.slowlog')
+
+_state = threading.local()
+
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDER_RE = re.compile(r'%s|\?')
+IN_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+SPACES_RE = re.compile(r'\s+')
+
+
+def normalize(sql):
+    sql = STRING_RE.sub('?', sql)
+    sql = NUMBER_RE.sub('?', sql)
+    sql = PLACEHOLDER_RE.sub('?', sql)
+    sql = IN_LIST_RE.sub('(...)', sql)
+    return SPACES_RE.sub(' ', sql).strip()
+
+
+def fingerprint(normalized):
+    return hashlib.sha1(normalized.encode()).hexdigest()
+
+
+def start(view=None):
+    _state.view = view
+    _state.queries = []
+
+
+def set_view(view):
+    _state.view = view
+
+
+def observe_timing(kind, duration, **extra):
+    queries = getattr(_state, 'queries', None)
+    if kind != 'db' or queries is None or extra['many']:
+        return
+    if duration * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+        queries.append((extra['alias'], extra['sql'], extra['params'],
+                        duration * 1000))
+
+
+def explain(alias, sql, params):
+    if not sql.lstrip().upper().startswith('SELECT'):
+        return ''
+    connection = connections[alias]
+    prefix = (
+        'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(prefix + sql, params)
+        return '\n'.join(
+            ' '.join(str(column) for column in row)
+            for row in cursor.fetchall()
+        )
+
+
+def save(alias, sql, params, duration, view):
+    normalized = normalize(sql)
+    key = fingerprint(normalized)
+    changes = {
+        'count': F('count') + 1,
+        'total_time': F('total_time') + duration,
+        'max_time': Greatest('max_time', Value(duration)),
+    }
+    if SlowQuery.objects.filter(fingerprint=key).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            SlowQuery.objects.create(
+                fingerprint=key,
+                sql=normalized,
+                view=view or '',
+                plan=explain(alias, sql, params),
+                count=1,
+                total_time=duration,
+                max_time=duration,
+            )
+    except IntegrityError:
+        SlowQuery.objects.filter(fingerprint=key).update(**changes)
+
+
+def finish():
+    # Запросы только откладываются: пишем их после отправки ответа.
+    queries = getattr(_state, 'queries', None) or []
+    _state.queries = None
+    if queries:
+        _state.pending = (queries, getattr(_state, 'view', None))
+
+
+@receiver(request_finished)
+def write_pending(sender, **kwargs):
+    pending = getattr(_state, 'pending', None)
+    if pending is None:
+        return
+    _state.pending = None
+    queries, view = pending
+    # Журнал не должен ломать запросы: ошибки записи только логируем.
+    try:
+        for alias, sql, params, duration in queries:
+            save(alias, sql, params, duration, view)
+    except Exception:
+        logger.exception('Не удалось записать медленные запросы')
+
+
+def top(order='-total_time', limit=20):
+    return SlowQuery.objects.annotate(avg=ExpressionWrapper(
+        F('total_time') / F('count'), output_field=FloatField()
+    )).order_by(order)[:limit]
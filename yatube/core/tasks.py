@@ -0,0 +1,152 @@
+import json
+import logging
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger('yatube.tasks')
+
+_registry = {}
+
+
+def task(name=None, priority=0, max_attempts=None):
+    # Регистрирует функцию как задачу; func.delay(...) ставит её в очередь.
+    def decorator(func):
+        task_name = name or f'{func.__module__}.{func.__name__}'
+        _registry[task_name] = func
+
+        def delay(*args, **kwargs):
+            return enqueue(
+                task_name, args, kwargs, priority=priority,
+                max_attempts=max_attempts)
+        func.task_name = task_name
+        func.delay = delay
+        return func
+    return decorator
+
+
+def enqueue(name, args=(), kwargs=None, priority=0, max_attempts=None,
+            countdown=0):
+    return Task.objects.create(
+        name=name,
+        args=json.dumps(list(args)),
+        kwargs=json.dumps(kwargs or {}),
+        priority=priority,
+        max_attempts=max_attempts or settings.TASK_MAX_ATTEMPTS,
+        run_after=timezone.now() + timedelta(seconds=countdown),
+    )
+
+
+def claim():
+    # Берём задачу условным UPDATE по прежним status и locked_at: если её
+    # уже забрал другой поток или процесс, строка не обновится.
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.TASK_LOCK_TIMEOUT)
+    ready = Task.objects.filter(
+        Q(status=Task.PENDING) | Q(status=Task.RUNNING, locked_at__lt=stale),
+        run_after__lte=now,
+    )
+    for pk, status, locked_at in ready.values_list(
+            'pk', 'status', 'locked_at')[:10]:
+        claimed = Task.objects.filter(
+            pk=pk, status=status, locked_at=locked_at,
+        ).update(status=Task.RUNNING, locked_at=now)
+        if claimed:
+            return Task.objects.get(pk=pk)
+    return None
+
+
+def execute(job):
+    func = _registry.get(job.name)
+    job.attempts += 1
+    try:
+        if func is None:
+            raise LookupError(f'Задача {job.name} не зарегистрирована')
+        func(*json.loads(job.args), **json.loads(job.kwargs))
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            job.status = Task.FAILED
+            logger.exception('Задача %s не выполнена', job)
+        else:
+            job.status = Task.PENDING
+            job.run_after = timezone.now() + timedelta(
+                seconds=settings.TASK_RETRY_BACKOFF * 2 ** (job.attempts - 1))
+    else:
+        job.status = Task.DONE
+    job.locked_at = None
+    finish(job)
+    return job.status == Task.DONE
+
+
+def finish(job, retries=5):
+    # Если статус не записать, задачу через TASK_LOCK_TIMEOUT выполнят
+    # повторно, поэтому кратковременную блокировку базы пережидаем.
+    for attempt in range(retries):
+        try:
+            job.save(update_fields=(
+                'status', 'attempts', 'run_after', 'locked_at',
+                'last_error', 'updated'))
+            return
+        except DatabaseError:
+            if attempt == retries - 1:
+                raise
+            time.sleep(0.05 * 2 ** attempt)
+
+
+def work(stop, until_empty=False, poll_interval=None):
+    poll_interval = poll_interval or settings.TASK_POLL_INTERVAL
+    processed = 0
+    while not stop.is_set():
+        try:
+            job = claim()
+        except DatabaseError as error:
+            # База занята другим писателем: просто попробуем позже.
+            logger.info('Не удалось взять задачу: %s', error)
+            stop.wait(poll_interval)
+            continue
+        if job is None:
+            if until_empty:
+                break
+            stop.wait(poll_interval)
+            continue
+        execute(job)
+        processed += 1
+    return processed
+
+
+def run_worker(concurrency=1, until_empty=False, poll_interval=None,
+               stop=None):
+    stop = stop or threading.Event()
+    if concurrency == 1:
+        return work(stop, until_empty, poll_interval)
+    results = []
+
+    def thread_main():
+        try:
+            results.append(work(stop, until_empty, poll_interval))
+        finally:
+            connections.close_all()
+
+    threads = [
+        threading.Thread(target=thread_main, daemon=True)
+        for _ in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        while any(thread.is_alive() for thread in threads):
+            time.sleep(0.1)
+    except KeyboardInterrupt:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    return sum(results)
@@ -0,0 +1,17 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from core import chrome as chrome_fragments
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def chrome(context, name, **params):
+    request = context['request']
+    # Параметры переживают маркер только строками, поэтому и при обычном
+    # рендере фрагмент получает строки.
+    params = {key: str(value) for key, value in params.items()}
+    if getattr(request, 'split_chrome', False):
+        return mark_safe(chrome_fragments.marker(name, params))
+    return chrome_fragments.render(request, name, params)
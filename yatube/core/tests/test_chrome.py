@@ -0,0 +1,81 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Follow, Group, Post, User
+
+
+class SplitChromeTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='chrome_author')
+        cls.reader = User.objects.create_user(username='chrome_reader')
+        cls.group = Group.objects.create(
+            title='Chrome', slug='chrome', description='Описание')
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text='Общий пост')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.urls = (
+            reverse('posts:index_page'),
+            reverse('posts:group_list', kwargs={'slug': cls.group.slug}),
+            reverse('posts:profile',
+                    kwargs={'username': cls.author.username}),
+            reverse('posts:trending'),
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def client_for(self, user):
+        client = Client()
+        if user is not None:
+            client.force_login(user)
+        return client
+
+    def test_same_html_as_regular_render(self):
+        for user in (None, self.author, self.reader):
+            for url in self.urls:
+                with self.subTest(user=user, url=url):
+                    cache.clear()
+                    regular = self.client_for(user).get(url).content
+                    with override_settings(SPLIT_CHROME_ENABLED=True):
+                        split = self.client_for(user).get(url).content
+                    self.assertEqual(split, regular)
+
+    @override_settings(SPLIT_CHROME_ENABLED=True)
+    def test_body_shared_between_users(self):
+        url = reverse('posts:profile',
+                      kwargs={'username': self.author.username})
+        self.client_for(None).get(url)
+        Post.objects.create(author=self.author, text='Новый пост')
+        response = self.client_for(self.reader).get(url)
+        self.assertNotContains(response, 'Новый пост')
+        self.assertNotContains(response, '<!--chrome:')
+        self.assertContains(response, 'Профиль: chrome_reader')
+        self.assertContains(response, 'Отписаться')
+        response = self.client_for(self.author).get(url)
+        self.assertContains(response, 'Профиль: chrome_author')
+        self.assertNotContains(response, 'Подписаться')
+        self.assertNotContains(response, 'Отписаться')
+        response = self.client_for(None).get(url)
+        self.assertContains(response, 'Подписаться')
+        self.assertContains(response, 'Войти')
+
+    @override_settings(SPLIT_CHROME_ENABLED=True)
+    def test_cached_body_skips_view(self):
+        url = reverse('posts:group_list', kwargs={'slug': self.group.slug})
+        client = self.client_for(self.reader)
+        client.get(url)
+        # Остаются только сессия и пользователь.
+        with self.assertNumQueries(2):
+            response = client.get(url)
+        self.assertContains(response, 'Профиль: chrome_reader')
+
+    @override_settings(SPLIT_CHROME_ENABLED=True)
+    def test_detail_page_not_shared(self):
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        self.client_for(None).get(url)
+        response = self.client_for(self.author).get(url)
+        self.assertContains(response, 'редактировать запись')
+        self.assertContains(response, 'csrfmiddlewaretoken')
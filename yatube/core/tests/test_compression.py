@@ -0,0 +1,86 @@
+import gzip
+
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import Client, RequestFactory, TestCase
+from django.urls import reverse
+
+from core.compression import minify
+from core.middleware import CompressionMiddleware
+from posts.models import Post, User
+
+
+class MinifyTests(TestCase):
+    def test_collapses_newline_whitespace(self):
+        html = '<ul>\n    <li>a  b</li>\n\n    <li>c</li>\n</ul>'
+        self.assertEqual(
+            minify(html), '<ul>\n<li>a  b</li>\n<li>c</li>\n</ul>')
+
+    def test_keeps_whitespace_sensitive_blocks(self):
+        for tag in ('pre', 'textarea', 'script', 'style', 'PRE'):
+            with self.subTest(tag=tag):
+                block = f'<{tag} class="x">\n  один\n\n    два\n</{tag}>'
+                html = f'<div>\n\n  {block}\n\n</div>'
+                self.assertEqual(minify(html), f'<div>\n{block}\n</div>')
+
+
+class CompressionMiddlewareTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='squeezed')
+        cls.post = Post.objects.create(
+            author=cls.user, text='Первая строка\n  вторая строка\n\nабзац')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.factory = RequestFactory()
+
+    def test_gzip_round_trip(self):
+        url = reverse('posts:index_page')
+        plain = self.client.get(url)
+        packed = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertEqual(packed['Content-Encoding'], 'gzip')
+        self.assertEqual(int(packed['Content-Length']), len(packed.content))
+        self.assertLess(len(packed.content), len(plain.content))
+        self.assertEqual(gzip.decompress(packed.content), plain.content)
+        self.assertIn('Accept-Encoding', packed['Vary'])
+
+    def test_linebreaks_intact(self):
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}))
+        self.assertContains(
+            response, '<p>Первая строка<br>  вторая строка</p>\n<p>абзац</p>')
+
+    def test_etag(self):
+        url = reverse('posts:group_list', kwargs={'slug': 'missing'})
+        self.assertFalse(self.client.get(url).has_header('ETag'))
+        url = reverse('posts:index_page')
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertTrue(response['ETag'].startswith('W/"'))
+        response = self.client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag'],
+            HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(response.content)
+
+    def test_small_response_not_compressed(self):
+        middleware = CompressionMiddleware(
+            lambda request: HttpResponse('<p>\n  коротко\n</p>'))
+        response = middleware(
+            self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip'))
+        self.assertNotIn('Content-Encoding', response)
+        self.assertEqual(response.content.decode(), '<p>\nкоротко\n</p>')
+
+    def test_streaming(self):
+        chunks = [b'<div>\n  ' + b'x' * 500 + b'\n</div>'] * 3
+        middleware = CompressionMiddleware(
+            lambda request: StreamingHttpResponse(iter(chunks)))
+        response = middleware(
+            self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(
+            gzip.decompress(b''.join(response.streaming_content)),
+            b''.join(chunks))
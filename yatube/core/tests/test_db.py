@@ -0,0 +1,20 @@
+from django.db import connection
+from django.test import TestCase
+
+
+class SQLiteTuningTests(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied(self):
+        test_data = {
+            'synchronous': 1,
+            'busy_timeout': 5000,
+            'cache_size': -20000,
+            'temp_store': 2,
+        }
+        for name, expected in test_data.items():
+            with self.subTest(name=name):
+                self.assertEqual(self.pragma(name), expected)
@@ -0,0 +1,101 @@
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.mail import claim, deliver_emails
+from core.models import OutboundEmail, Task
+from core.tasks import run_worker
+from posts.models import User
+
+
+class CountingBackend(EmailBackend):
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return True
+
+
+class BrokenBackend(EmailBackend):
+    def send_messages(self, messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+@override_settings(
+    EMAIL_BACKEND='core.mail.QueuedEmailBackend',
+    EMAIL_DELIVERY_BACKEND='core.tests.test_mail.CountingBackend',
+)
+class QueuedEmailTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='mailer', email='mailer@example.com', password='pass')
+
+    def setUp(self):
+        CountingBackend.opened = 0
+
+    def test_password_reset_is_queued(self):
+        response = self.client.post(
+            reverse('users:password_reset_form'),
+            {'email': self.user.email})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(
+            OutboundEmail.objects.get().to, '["mailer@example.com"]')
+        run_worker(until_empty=True)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [self.user.email])
+        self.assertEqual(
+            OutboundEmail.objects.get().status, OutboundEmail.SENT)
+
+    def test_batch_reuses_connection(self):
+        for number in range(3):
+            mail.send_mail(f'Тема {number}', 'Текст', None, ['a@example.com'])
+        self.assertEqual(Task.objects.count(), 1)
+        run_worker(until_empty=True)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(CountingBackend.opened, 1)
+
+    @override_settings(
+        EMAIL_DELIVERY_BACKEND='core.tests.test_mail.BrokenBackend',
+        EMAIL_MAX_ATTEMPTS=2, TASK_RETRY_BACKOFF=0)
+    def test_failed_delivery_is_retried(self):
+        mail.send_mail('Тема', 'Текст', None, ['a@example.com'])
+        run_worker(until_empty=True)
+        email = OutboundEmail.objects.get()
+        self.assertEqual((email.status, email.attempts),
+                         (OutboundEmail.FAILED, 2))
+        self.assertIn('SMTP', email.last_error)
+
+    def test_claimed_email_not_sent_twice(self):
+        mail.send_mail('Тема', 'Текст', None, ['a@example.com'])
+        first = claim(10)
+        self.assertEqual(len(first), 1)
+        self.assertEqual(first[0].status, OutboundEmail.SENDING)
+        self.assertEqual(claim(10), [])
+        deliver_emails()
+        self.assertEqual(mail.outbox, [])
+
+    @override_settings(TASK_LOCK_TIMEOUT=0)
+    def test_abandoned_claim_is_taken_again(self):
+        mail.send_mail('Тема', 'Текст', None, ['a@example.com'])
+        claim(10)
+        deliver_emails()
+        self.assertEqual(len(mail.outbox), 1)
+
+    @override_settings(
+        EMAIL_DELIVERY_BACKEND='core.tests.test_mail.BrokenBackend',
+        TASK_RETRY_BACKOFF=60)
+    def test_single_retry_task(self):
+        mail.send_mail('Тема', 'Текст', None, ['a@example.com'])
+        Task.objects.all().delete()
+        for _ in range(2):
+            OutboundEmail.objects.update(send_after=timezone.now())
+            deliver_emails()
+        self.assertEqual(
+            Task.objects.filter(status=Task.PENDING).count(), 1)
+        self.assertEqual(
+            OutboundEmail.objects.get().status, OutboundEmail.PENDING)
@@ -0,0 +1,98 @@
+import json
+import os
+import shutil
+import tempfile
+from http import HTTPStatus
+
+from django.test import Client, TestCase, override_settings
+
+from core.metrics import registry
+from posts.models import User
+
+TEMP_METRICS_DIR = tempfile.mkdtemp()
+
+
+@override_settings(METRICS_DIR=TEMP_METRICS_DIR, METRICS_TOKEN='secret')
+class MetricsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_user(
+            username='metrics_admin', is_staff=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_METRICS_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        # Архив умерших процессов копится между тестами: начинаем с нуля.
+        shutil.rmtree(TEMP_METRICS_DIR, ignore_errors=True)
+        self.guest_client = Client()
+        self.admin_client = Client()
+        self.admin_client.force_login(self.admin)
+
+    def test_endpoint_protected(self):
+        response = self.guest_client.get('/metrics/')
+        self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN)
+        response = self.guest_client.get(
+            '/metrics/', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_builtin_series(self):
+        self.guest_client.get('/')
+        self.guest_client.get('/')
+        content = self.admin_client.get('/metrics/').content.decode()
+        series = (
+            'yatube_http_requests_total{view="posts:index_page",'
+            'method="GET",status="200"}',
+            'yatube_http_request_duration_seconds_bucket'
+            '{view="posts:index_page",le="+Inf"}',
+            'yatube_db_query_duration_seconds_count{alias="default"}',
+            'yatube_cache_requests_total{result="hit"}',
+            'yatube_cache_requests_total{result="miss"}',
+        )
+        for name in series:
+            with self.subTest(name=name):
+                self.assertIn(name, content)
+
+    def write_dead_process(self):
+        dead_pid = 2 ** 22 + 1
+        path = os.path.join(TEMP_METRICS_DIR, f'{dead_pid}.json')
+        with open(path, 'w') as f:
+            json.dump({
+                'yatube_http_requests_total': {
+                    'kind': 'counter',
+                    'help': '',
+                    'labelnames': ['view', 'method', 'status'],
+                    'values': {'["other", "GET", "200"]': 7},
+                },
+                'yatube_http_requests_in_progress': {
+                    'kind': 'gauge',
+                    'help': '',
+                    'labelnames': [],
+                    'values': {'[]': 100},
+                },
+            }, f)
+        return path
+
+    def test_aggregates_other_processes(self):
+        registry.flush()
+        self.write_dead_process()
+        merged = registry.collect()
+        self.assertEqual(
+            merged['yatube_http_requests_total']['values'][
+                '["other", "GET", "200"]'], 7)
+        in_progress = merged.get('yatube_http_requests_in_progress', {})
+        self.assertLess(in_progress.get('values', {}).get('[]', 0), 100)
+
+    def test_dead_processes_pruned(self):
+        registry.flush()
+        path = self.write_dead_process()
+        registry.collect()
+        self.assertFalse(os.path.exists(path))
+        # Счётчики умершего процесса остаются в архиве и не удваиваются.
+        merged = registry.collect()
+        self.assertEqual(
+            merged['yatube_http_requests_total']['values'][
+                '["other", "GET", "200"]'], 7)
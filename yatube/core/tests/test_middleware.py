@@ -0,0 +1,53 @@
+from unittest import mock
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import Client, TestCase, override_settings
+
+from core import metrics, profiling, slowlog
+from core.middleware import ProfilingMiddleware
+from posts.models import Post, User
+
+
+class ProfilingMiddlewareTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='profiled')
+        Post.objects.create(author=cls.user, text='Profiled post')
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    @override_settings(PROFILING_ENABLED=True)
+    def test_server_timing_header(self):
+        response = self.guest_client.get('/')
+        timing = response['Server-Timing']
+        for metric in ('db;', 'template;', 'cache;', 'total;'):
+            with self.subTest(metric=metric):
+                self.assertIn(metric, timing)
+
+    @override_settings(PROFILING_ENABLED=True, PROFILING_LOG_SAMPLE_RATE=1)
+    def test_sampled_log_line(self):
+        with self.assertLogs('yatube.profiling', level='INFO') as logs:
+            self.guest_client.get('/')
+        self.assertIn('"view": "posts:index_page"', logs.output[0])
+
+    @override_settings(PROFILING_ENABLED=False)
+    def test_disabled(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            ProfilingMiddleware(lambda request: HttpResponse())
+
+    def test_listeners_install_only_needed_patches(self):
+        patches = {kind: mock.Mock() for kind in profiling.PATCHED_KINDS}
+        with mock.patch.object(profiling, '_installed', set()), \
+                mock.patch.object(profiling, '_listeners', []), \
+                mock.patch.dict(profiling._PATCHES, patches):
+            profiling.add_listener(slowlog.observe_timing)
+            for patch in patches.values():
+                patch.assert_not_called()
+            profiling.add_listener(metrics.observe_timing, metrics.TIMED_KINDS)
+            profiling.add_listener(metrics.observe_timing, metrics.TIMED_KINDS)
+        patches['cache'].assert_called_once_with()
+        patches['thumbnail'].assert_called_once_with()
+        patches['template'].assert_not_called()
@@ -0,0 +1,57 @@
+from django.core.cache import cache
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from core import ratelimit
+from posts.models import Post, User
+
+RATELIMITS = {'posts:add_comment': {'user': '2/m', 'methods': ('POST',)}}
+
+
+class RateLimitTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='limited')
+        cls.post = Post.objects.create(author=cls.user, text='Limited post')
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_window_slides(self):
+        self.assertEqual(ratelimit.consume('test', '2/m', now=60), 0)
+        self.assertEqual(ratelimit.consume('test', '2/m', now=70), 0)
+        self.assertEqual(ratelimit.consume('test', '2/m', now=90), 60)
+        # В начале следующего окна предыдущее ещё считается целиком.
+        self.assertEqual(ratelimit.consume('test', '2/m', now=120), 30)
+        self.assertEqual(ratelimit.consume('test', '2/m', now=150), 0)
+        self.assertEqual(ratelimit.consume('test', '2/m', now=150), 30)
+
+    def test_no_double_burst_at_window_boundary(self):
+        for now in (118, 119):
+            self.assertEqual(ratelimit.consume('test', '2/m', now=now), 0)
+        self.assertGreater(ratelimit.consume('test', '2/m', now=120), 0)
+        self.assertGreater(ratelimit.consume('test', '2/m', now=121), 0)
+
+    @override_settings(RATELIMITS=RATELIMITS)
+    def test_middleware_returns_429(self):
+        url = reverse('posts:add_comment', kwargs={'post_id': self.post.pk})
+        for _ in range(2):
+            response = self.authorized_client.post(url, {'text': 'Да'})
+            self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.authorized_client.get(url).status_code, 302)
+        response = self.authorized_client.post(url, {'text': 'Да'})
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+        self.assertEqual(self.post.comments.count(), 2)
+
+    def test_decorator_limits_per_ip(self):
+        view = ratelimit.ratelimit(ip='1/m')(lambda request: 'ok')
+        request = RequestFactory().get('/')
+        request.user = self.user
+        self.assertEqual(view(request), 'ok')
+        self.assertEqual(view(request).status_code, 429)
+        request.META['REMOTE_ADDR'] = '10.0.0.1'
+        self.assertEqual(view(request), 'ok')
@@ -0,0 +1,103 @@
+import os
+import time
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.test import Client, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from core import routers
+from core.routers import PrimaryReplicaRouter
+from posts.models import Group, Post, User
+
+
+class ReplicaRouterTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='replica_user')
+
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def tearDown(self):
+        routers.use_replica(False)
+
+    def test_reads_routed_to_replica(self):
+        self.assertIsNone(self.router.db_for_read(Post))
+        routers.use_replica(True)
+        self.assertEqual(self.router.db_for_read(Post), 'replica')
+        self.assertEqual(self.router.db_for_write(Post), 'default')
+
+    def test_auth_read_from_primary(self):
+        routers.use_replica(True)
+        self.assertIsNone(self.router.db_for_read(User))
+        self.assertIsNone(self.router.db_for_read(Session))
+
+    def test_unsynced_replica_not_used(self):
+        self.assertFalse(routers.replica_ready())
+        response = self.authorized_client.get('/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_write_pins_user_to_primary(self):
+        response = self.authorized_client.post(
+            '/create/', data={'text': 'Replica post'})
+        self.assertIn(routers.PIN_COOKIE, response.cookies)
+        response = self.authorized_client.get('/')
+        self.assertNotIn(routers.PIN_COOKIE, response.cookies)
+
+    def test_migrations_only_on_primary(self):
+        self.assertTrue(self.router.allow_migrate('default', 'posts'))
+        self.assertFalse(self.router.allow_migrate('replica', 'posts'))
+
+
+class ReplicaSyncTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        self.name = connections.databases['replica']['NAME']
+        self.user = User.objects.create_user(username='synced_author')
+        self.group = Group.objects.create(
+            title='Синхронизация', slug='synced', description='-')
+        Post.objects.create(
+            author=self.user, group=self.group, text='Скопированный пост')
+        call_command('sync_replica', stdout=StringIO())
+        Post.objects.create(
+            author=self.user, group=self.group, text='Пост после копии')
+
+    def tearDown(self):
+        routers.use_replica(False)
+        if os.path.exists(routers.sync_stamp(self.name)):
+            os.remove(routers.sync_stamp(self.name))
+
+    def group_page(self, client):
+        cache.clear()
+        return client.get(
+            reverse('posts:group_list', args=[self.group.slug]))
+
+    def test_read_views_served_from_synced_copy(self):
+        self.assertTrue(routers.replica_ready())
+        response = self.group_page(Client())
+        self.assertContains(response, 'Скопированный пост')
+        self.assertNotContains(response, 'Пост после копии')
+
+    def test_new_user_stays_logged_in(self):
+        reader = User.objects.create_user(username='fresh_reader')
+        client = Client()
+        client.force_login(reader)
+        response = self.group_page(client)
+        self.assertNotContains(response, 'Пост после копии')
+        self.assertEqual(response.context['user'], reader)
+
+    def test_stale_copy_not_used(self):
+        stale = time.time() - settings.REPLICA_MAX_LAG - 1
+        routers.mark_synced(self.name, stale)
+        self.assertFalse(routers.replica_ready())
+        self.assertContains(self.group_page(Client()), 'Пост после копии')
@@ -0,0 +1,63 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import Client, TestCase, override_settings
+
+from core.models import SlowQuery
+from core.slowlog import fingerprint, normalize, save
+from posts.models import Post, User
+
+
+@override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+class SlowQueryLogTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='slow')
+        cls.post = Post.objects.create(author=cls.user, text='Slow post')
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_normalize(self):
+        self.assertEqual(
+            normalize("SELECT * FROM t WHERE a = 'x' AND b IN (1, 2,  3)"),
+            'SELECT * FROM t WHERE a = ? AND b IN (...)',
+        )
+        self.assertEqual(
+            fingerprint(normalize('SELECT 1 WHERE id = %s')),
+            fingerprint(normalize('SELECT 1 WHERE id = 42')),
+        )
+
+    def test_queries_aggregated_by_fingerprint(self):
+        url = f'/posts/{self.post.pk}/'
+        self.guest_client.get(url)
+        self.guest_client.get(url)
+        query = SlowQuery.objects.get(sql__contains='"posts_comment"')
+        self.assertEqual(query.count, 2)
+        self.assertEqual(query.view, 'posts:post_detail')
+        self.assertIn('POSTS_COMMENT', query.plan.upper())
+        self.assertGreaterEqual(query.total_time, query.max_time)
+
+    def test_command_lists_top_offenders(self):
+        self.guest_client.get('/')
+        out = StringIO()
+        call_command('slow_queries', '--order', 'avg', '--plan', stdout=out)
+        self.assertIn('posts:index_page', out.getvalue())
+        call_command('slow_queries', '--reset')
+        self.assertFalse(SlowQuery.objects.exists())
+
+    def test_write_errors_do_not_break_requests(self):
+        url = f'/posts/{self.post.pk}/'
+        with mock.patch('core.slowlog.save', side_effect=DatabaseError):
+            with self.assertLogs('yatube.slowlog', level='ERROR'):
+                response = self.guest_client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_first_view_is_kept(self):
+        for view in ('posts:post_detail', 'posts:profile'):
+            save('default', 'SELECT 1 WHERE 1 = %s', (1,), 5.0, view)
+        query = SlowQuery.objects.get(sql='SELECT ? WHERE ? = ?')
+        self.assertEqual((query.view, query.count), ('posts:post_detail', 2))
@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from core.models import Task
+from core.tasks import claim, run_worker, task
+
+calls = []
+
+
+@task(name='tests.record', priority=0)
+def record(value):
+    calls.append(value)
+
+
+@task(name='tests.urgent', priority=5)
+def urgent(value):
+    calls.append(value)
+
+
+@task(name='tests.flaky', max_attempts=2)
+def flaky():
+    raise ValueError('flaky')
+
+
+@override_settings(TASK_RETRY_BACKOFF=30)
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_priority_order(self):
+        record.delay('first')
+        record.delay('second')
+        urgent.delay('urgent')
+        self.assertEqual(run_worker(until_empty=True), 3)
+        self.assertEqual(calls, ['urgent', 'first', 'second'])
+        self.assertFalse(Task.objects.exclude(status=Task.DONE).exists())
+
+    def test_retry_with_backoff(self):
+        job = flaky.delay()
+        run_worker(until_empty=True)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Task.PENDING, 1))
+        self.assertGreater(
+            job.run_after, timezone.now() + timedelta(seconds=25))
+        self.assertIn('ValueError', job.last_error)
+        Task.objects.update(run_after=timezone.now())
+        with self.assertLogs('yatube.tasks', 'ERROR'):
+            run_worker(until_empty=True)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Task.FAILED, 2))
+
+    def test_stale_running_task_is_reclaimed(self):
+        job = record.delay('stale')
+        self.assertEqual(claim(), job)
+        self.assertIsNone(claim())
+        Task.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(claim(), job)
+
+
+class ConcurrentWorkerTests(TransactionTestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_each_task_runs_once(self):
+        for value in range(20):
+            record.delay(value)
+        self.assertEqual(run_worker(concurrency=4, until_empty=True), 20)
+        self.assertEqual(sorted(calls), list(range(20)))
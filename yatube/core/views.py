@@ -1,7 +1,15 @@
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
 from django.shortcuts import render
 
+from .metrics import registry
+from .negative import KnownMissing, static_not_found
+
 
 def page_not_found(request, exception):
+    if isinstance(exception, KnownMissing):
+        return static_not_found()
     return render(request, 'core/404.html', {'path': request.path}, status=404)
 
 
@@ -15,3 +23,15 @@ def permission_denied(request, exception):
 
 def csrf_failure(request, reason=''):
     return render(request, 'core/403csrf.html')
+
+
+def metrics(request):
+    token = settings.METRICS_TOKEN
+    authorization = request.META.get('HTTP_AUTHORIZATION', '')
+    if not (request.user.is_staff
+            or token and authorization == f'Bearer {token}'):
+        raise PermissionDenied
+    return HttpResponse(
+        registry.exposition(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
@@ -1,15 +1,212 @@
-from django.contrib import admin
+from hashlib import md5
 
-from .models import Group, Post
+from django import forms
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.admin.options import IS_POPUP_VAR
+from django.contrib.auth import get_permission_codename
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.http import HttpResponseRedirect
+from django.urls import reverse
+from django.utils.functional import cached_property
 
+from . import bulk
+from .entities import group_choices
+from .models import BulkJob, Comment, Follow, Group, Post
 
-class PostAdmin(admin.ModelAdmin):
+
+class CachedCountPaginator(Paginator):
+    # COUNT(*) по большой таблице дороже самой страницы: держим его в кеше
+    # недолго, отдельно для каждого набора фильтров.
+    @cached_property
+    def count(self):
+        query = self.object_list.query.sql_with_params()
+        key = 'admin:count:' + md5(repr(query).encode()).hexdigest()
+        count = cache.get(key)
+        if count is None:
+            count = super().count
+            cache.set(key, count, settings.ADMIN_COUNT_CACHE_TIMEOUT)
+        return count
+
+
+class BaseAdmin(admin.ModelAdmin):
+    paginator = CachedCountPaginator
+    show_full_result_count = False
+    empty_value_display = '-пусто-'
+
+
+def queued(request, job):
+    messages.info(request, f'{job} поставлена в очередь.')
+
+
+class QueuedDeleteMixin:
+    # Каскадное удаление не должно идти внутри запроса: и действие над
+    # списком, и страница удаления одного объекта ставят фоновую задачу.
+    # job_permissions — права на связанные записи, которые задача удалит
+    # или изменит; без них задача не ставится, как и в обычном удалении.
+    job_permissions = ()
+
+    def delete_job(self, request, obj):
+        raise NotImplementedError
+
+    def missing_permissions(self, request):
+        missing = set()
+        for action, model in self.job_permissions:
+            opts = model._meta
+            codename = get_permission_codename(action, opts)
+            if not request.user.has_perm(f'{opts.app_label}.{codename}'):
+                missing.add(str(opts.verbose_name_plural))
+        return missing
+
+    def check_job_permissions(self, request):
+        missing = self.missing_permissions(request)
+        if missing:
+            messages.error(request, 'Недостаточно прав на связанные записи: '
+                           + ', '.join(sorted(missing)))
+        return not missing
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def get_deleted_objects(self, objs, request):
+        # Страница подтверждения не обходит связанные записи, но права
+        # на них проверяет: без них delete_view откажет в удалении.
+        return (
+            [str(obj) for obj in objs], {},
+            self.missing_permissions(request), [],
+        )
+
+    def delete_model(self, request, obj):
+        queued(request, self.delete_job(request, obj))
+
+    def response_delete(self, request, obj_display, obj_id):
+        if IS_POPUP_VAR in request.POST:
+            return super().response_delete(request, obj_display, obj_id)
+        # Без сообщения «удалён успешно»: объект пока на месте.
+        opts = self.model._meta
+        return HttpResponseRedirect(reverse(
+            f'admin:{opts.app_label}_{opts.model_name}_changelist',
+            current_app=self.admin_site.name))
+
+
+class PostActionForm(ActionForm):
+    group = forms.ModelChoiceField(
+        Group.objects.all(), required=False, label='Группа')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['group'].choices = group_choices()
+
+
+class PostAdmin(QueuedDeleteMixin, BaseAdmin):
     list_display = ('pk', 'text', 'pub_date', 'author', 'group')
     list_editable = ('group',)
+    list_select_related = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date',)
-    empty_value_display = '-пусто-'
+    autocomplete_fields = ('author',)
+    action_form = PostActionForm
+    actions = ('queue_reassign_group', 'queue_delete_posts')
+    job_permissions = (('delete', Comment),)
+
+    def delete_job(self, request, obj):
+        return bulk.enqueue(
+            BulkJob.DELETE_POSTS, created_by=request.user, post_ids=[obj.pk])
+
+    def queue_reassign_group(self, request, queryset):
+        queued(request, bulk.enqueue(
+            BulkJob.REASSIGN_GROUP,
+            created_by=request.user,
+            post_ids=list(queryset.values_list('pk', flat=True)),
+            group_id=request.POST.get('group') or None,
+        ))
+    queue_reassign_group.short_description = 'Перенести в группу'
+    queue_reassign_group.allowed_permissions = ('change',)
+
+    def queue_delete_posts(self, request, queryset):
+        if not self.check_job_permissions(request):
+            return
+        queued(request, bulk.enqueue(
+            BulkJob.DELETE_POSTS,
+            created_by=request.user,
+            post_ids=list(queryset.values_list('pk', flat=True)),
+        ))
+    queue_delete_posts.short_description = 'Удалить в фоне'
+    queue_delete_posts.allowed_permissions = ('delete',)
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        formfield = super().formfield_for_foreignkey(
+            db_field, request, **kwargs)
+        if db_field.name == 'group':
+            # Иначе список групп выбирается заново для каждой строки.
+            formfield.choices = group_choices()
+        return formfield
+
+
+class CommentAdmin(BaseAdmin):
+    list_display = ('pk', 'text', 'created', 'author', 'post')
+    list_select_related = ('author', 'post')
+    search_fields = ('text',)
+    list_filter = ('created',)
+    autocomplete_fields = ('author', 'post')
+
+
+class FollowAdmin(BaseAdmin):
+    list_display = ('pk', 'user', 'author')
+    list_select_related = ('user', 'author')
+    search_fields = ('user__username', 'author__username')
+    autocomplete_fields = ('user', 'author')
+
+
+class GroupAdmin(QueuedDeleteMixin, BaseAdmin):
+    list_display = ('pk', 'title', 'slug')
+    search_fields = ('title', 'slug')
+    prepopulated_fields = {'slug': ('title',)}
+    actions = ('queue_delete_group',)
+    job_permissions = (('change', Post),)
+
+    def delete_job(self, request, obj):
+        return bulk.enqueue(
+            BulkJob.DELETE_GROUP, created_by=request.user, group_id=obj.pk)
+
+    def queue_delete_group(self, request, queryset):
+        if not self.check_job_permissions(request):
+            return
+        for group in queryset:
+            queued(request, self.delete_job(request, group))
+    queue_delete_group.short_description = 'Удалить в фоне'
+    queue_delete_group.allowed_permissions = ('delete',)
+
+
+class BulkJobAdmin(BaseAdmin):
+    list_display = (
+        'pk', 'action', 'status', 'progress', 'created_by', 'created',
+        'updated',
+    )
+    list_filter = ('status', 'action')
+    list_select_related = ('created_by',)
+    readonly_fields = (
+        'action', 'params', 'status', 'stage', 'last_pk', 'processed',
+        'total', 'error', 'created_by', 'created', 'updated',
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    def progress(self, job):
+        if job.status == BulkJob.DONE:
+            return '100%'
+        percent = min(99, 100 * job.processed // job.total) if job.total else 0
+        return f'{job.processed} из ~{job.total} ({percent}%)'
+    progress.short_description = 'Прогресс'
 
 
 admin.site.register(Post, PostAdmin)
-admin.site.register(Group)
+admin.site.register(Group, GroupAdmin)
+admin.site.register(Comment, CommentAdmin)
+admin.site.register(Follow, FollowAdmin)
+admin.site.register(BulkJob, BulkJobAdmin)
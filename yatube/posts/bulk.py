@@ -0,0 +1,138 @@
+import json
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from .models import BulkJob, Comment, Follow, Group, Post, User
+
+
+def from_ids(model, key):
+    # Выбранные в админке ключи храним в параметрах задачи и режем список
+    # сами: IN на тысячи значений не пролезет в лимит переменных SQLite.
+    def source(params, after, size):
+        ids = [pk for pk in sorted(params[key]) if pk > after][:size]
+        return model.objects.filter(pk__in=ids), ids
+    return source
+
+
+def from_queryset(build):
+    def source(params, after, size):
+        ids = list(build(params).filter(pk__gt=after).order_by(
+            'pk').values_list('pk', flat=True)[:size])
+        return build(params).model.objects.filter(pk__in=ids), ids
+    return source
+
+
+def delete(queryset, params):
+    queryset.delete()
+
+
+def set_group(queryset, params):
+    queryset.update(group_id=params['group_id'])
+
+
+def clear_group(queryset, params):
+    queryset.update(group=None)
+
+
+# Каждое действие — последовательность этапов (источник строк, операция).
+# Этап проходится порциями по возрастанию pk; номер этапа и последний
+# ключ сохраняются вместе с порцией, поэтому прерванная задача
+# продолжается с того же места.
+ACTIONS = {
+    BulkJob.REASSIGN_GROUP: (
+        (from_ids(Post, 'post_ids'), set_group),
+    ),
+    BulkJob.DELETE_POSTS: (
+        (from_ids(Post, 'post_ids'), delete),
+    ),
+    BulkJob.DELETE_GROUP: (
+        (from_queryset(lambda params: Post.objects.filter(
+            group_id=params['group_id'])), clear_group),
+        (from_queryset(lambda params: Group.objects.filter(
+            pk=params['group_id'])), delete),
+    ),
+    BulkJob.PURGE_USER: (
+        (from_queryset(lambda params: Comment.objects.filter(
+            Q(author_id=params['user_id'])
+            | Q(post__author_id=params['user_id']))), delete),
+        (from_queryset(lambda params: Post.objects.filter(
+            author_id=params['user_id'])), delete),
+        (from_queryset(lambda params: Follow.objects.filter(
+            Q(user_id=params['user_id'])
+            | Q(author_id=params['user_id']))), delete),
+        (from_queryset(lambda params: User.objects.filter(
+            pk=params['user_id'])), delete),
+    ),
+}
+
+
+def estimate(action, params):
+    if action in (BulkJob.REASSIGN_GROUP, BulkJob.DELETE_POSTS):
+        return len(params['post_ids'])
+    if action == BulkJob.DELETE_GROUP:
+        return Post.objects.filter(group_id=params['group_id']).count() + 1
+    return (
+        Post.objects.filter(author_id=params['user_id']).count()
+        + Comment.objects.filter(author_id=params['user_id']).count()
+        + 1
+    )
+
+
+def enqueue(action, created_by=None, **params):
+    from .tasks import run_bulk_job
+
+    job = BulkJob.objects.create(
+        action=action,
+        params=json.dumps(params),
+        total=estimate(action, params),
+        created_by=created_by,
+    )
+    # Задача пишется в ту же базу и в той же транзакции, что и операция.
+    run_bulk_job.delay(job.pk)
+    return job
+
+
+def run_chunk(job, size=None):
+    # Возвращает False, когда задача завершена.
+    size = size or settings.BULK_JOB_CHUNK_SIZE
+    params = json.loads(job.params)
+    stages = ACTIONS[job.action]
+    if job.stage >= len(stages):
+        job.status = BulkJob.DONE
+        job.save(update_fields=('status', 'updated'))
+        return False
+    source, operation = stages[job.stage]
+    with transaction.atomic():
+        queryset, ids = source(params, job.last_pk, size)
+        if ids:
+            operation(queryset, params)
+            job.last_pk = ids[-1]
+            job.processed += len(ids)
+        else:
+            job.stage += 1
+            job.last_pk = 0
+        job.status = BulkJob.RUNNING
+        job.save(update_fields=(
+            'stage', 'last_pk', 'processed', 'status', 'updated'))
+    return True
+
+
+def run(job, size=None):
+    try:
+        while run_chunk(job, size):
+            pass
+    except Exception as error:
+        job.status = BulkJob.FAILED
+        job.error = repr(error)
+        job.save(update_fields=('status', 'error', 'updated'))
+        raise
+    return job
+
+
+def pending_jobs(include_failed=False):
+    statuses = [BulkJob.PENDING, BulkJob.RUNNING]
+    if include_failed:
+        statuses.append(BulkJob.FAILED)
+    return BulkJob.objects.filter(status__in=statuses).order_by('pk')
@@ -0,0 +1,21 @@
+from core.chrome import fragment
+
+from .follows import is_following
+
+
+@fragment('follow_button', 'includes/follow_button.html')
+def follow_button(request, username, author_id):
+    author_id = int(author_id)
+    if request.user.pk == author_id:
+        return None
+    return {
+        'username': username,
+        'following': is_following(request.user, author_id),
+    }
+
+
+@fragment('edit_button', 'includes/edit_button.html')
+def edit_button(request, post_id, author_id):
+    if request.user.pk != int(author_id):
+        return None
+    return {'post_id': post_id}
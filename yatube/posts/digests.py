@@ -0,0 +1,88 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.urls import reverse
+
+from .models import Follow, NewPostEvent, Post
+
+
+def record(post):
+    NewPostEvent.objects.create(post_id=post.pk, author_id=post.author_id)
+
+
+def recipients(last_event):
+    # Подписчики всех авторов из накопленных событий: один запрос
+    # с DISTINCT вместо перебора подписчиков по каждому посту.
+    return Follow.objects.filter(
+        author__new_post_events__pk__lte=last_event,
+    ).exclude(user__email='').order_by('user_id').values_list(
+        'user_id', flat=True).distinct()
+
+
+def digest_rows(last_event, user_ids):
+    # Только пары «подписчик — пост» без текста: текст каждого поста
+    # загружается один раз для всех подписчиков.
+    return Post.objects.filter(
+        new_post_events__pk__lte=last_event,
+        author__following__user_id__in=user_ids,
+    ).order_by('author__following__user_id', '-pub_date').values_list(
+        'author__following__user_id', 'author__following__user__email',
+        'pk',
+    )
+
+
+def build_messages(rows, posts):
+    # posts — общий для всех пачек словарь уже загруженных постов.
+    post_ids = defaultdict(list)
+    emails = {}
+    for user_id, email, pk in rows:
+        emails[user_id] = email
+        if len(post_ids[user_id]) < settings.DIGEST_MAX_POSTS:
+            post_ids[user_id].append(pk)
+    missing = {
+        pk for ids in post_ids.values() for pk in ids if pk not in posts
+    }
+    posts.update({
+        pk: {
+            'author': username,
+            'text': text,
+            'url': settings.SITE_URL + reverse(
+                'posts:post_detail', args=[pk]),
+        }
+        for pk, text, username in Post.objects.filter(
+            pk__in=missing).values_list('pk', 'text', 'author__username')
+    } if missing else {})
+    return [
+        EmailMessage(
+            subject='Новые посты авторов, на которых вы подписаны',
+            body=render_to_string(
+                'posts/email/digest.txt',
+                {'posts': [posts[pk] for pk in ids if pk in posts]}),
+            to=[emails[user_id]],
+        )
+        for user_id, ids in post_ids.items()
+    ]
+
+
+def send_digests():
+    last_event = NewPostEvent.objects.order_by('-pk').values_list(
+        'pk', flat=True).first()
+    if last_event is None:
+        return 0
+    user_ids = list(recipients(last_event))
+    sent = 0
+    posts = {}
+    connection = get_connection()
+    # Каждая пачка коммитится отдельно и не держит блокировку записи
+    # SQLite весь прогон. Если прогон оборвётся, события останутся и
+    # уже отправленные пачки получат дайджест повторно.
+    for start in range(0, len(user_ids), settings.DIGEST_BATCH_SIZE):
+        batch = user_ids[start:start + settings.DIGEST_BATCH_SIZE]
+        with transaction.atomic():
+            sent += connection.send_messages(
+                build_messages(digest_rows(last_event, batch), posts)) or 0
+    NewPostEvent.objects.filter(pk__lte=last_event).delete()
+    return sent
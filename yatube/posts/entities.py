@@ -0,0 +1,113 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404
+
+from core import negative
+
+from .models import Group, User
+
+# Публичные поля, которых хватает страницам; остальные поля у собранных
+# из кеша объектов отложены и при обращении подгрузятся из базы.
+ENTITY_FIELDS = {
+    Group: ('id', 'title', 'slug', 'description'),
+    User: ('id', 'username', 'first_name', 'last_name'),
+}
+ENTITY_LOOKUPS = {
+    Group: ('slug',),
+    User: ('username',),
+}
+GROUP_CHOICES_KEY = 'admin:group_choices'
+
+
+def entity_key(model, pk):
+    return f'entity:{model._meta.label_lower}:{pk}'
+
+
+def alias_key(model, field, value):
+    return f'entity:{model._meta.label_lower}:{field}:{value}'
+
+
+def build(model, row):
+    return model.from_db('default', ENTITY_FIELDS[model], row)
+
+
+def invalidate(model, instance):
+    cache.delete(entity_key(model, instance.pk))
+    # Объект мог появиться под именем, которое недавно искали впустую.
+    for field in ENTITY_LOOKUPS[model]:
+        negative.forget(missing_kind(model, field), getattr(instance, field))
+
+
+def group_choices():
+    # Варианты выбора группы для форм админки.
+    choices = cache.get(GROUP_CHOICES_KEY)
+    if choices is None:
+        choices = [('', '---------')] + [
+            (pk, title) for pk, title in
+            Group.objects.order_by('title').values_list('pk', 'title')
+        ]
+        cache.set(GROUP_CHOICES_KEY, choices, settings.ADMIN_CHOICES_TIMEOUT)
+    return choices
+
+
+def get_many(model, pks):
+    keys = {entity_key(model, pk): pk for pk in pks}
+    rows = {keys[key]: row for key, row in cache.get_many(keys).items()}
+    missing = [pk for pk in keys.values() if pk not in rows]
+    if missing:
+        fetched = {
+            row[0]: row for row in model.objects.filter(
+                pk__in=missing).values_list(*ENTITY_FIELDS[model])
+        }
+        cache.set_many(
+            {entity_key(model, pk): row for pk, row in fetched.items()},
+            settings.ENTITY_CACHE_TIMEOUT,
+        )
+        rows.update(fetched)
+    return {pk: build(model, row) for pk, row in rows.items()}
+
+
+def get_by(model, field, value):
+    # Псевдоним хранит только pk: после переименования он укажет на
+    # запись с другим значением поля, и мы просто перечитаем её из базы.
+    alias = alias_key(model, field, value)
+    pk = cache.get(alias)
+    if pk is not None:
+        obj = get_many(model, [pk]).get(pk)
+        if obj is not None and getattr(obj, field) == value:
+            return obj
+    row = model.objects.filter(**{field: value}).values_list(
+        *ENTITY_FIELDS[model]).first()
+    if row is None:
+        return None
+    cache.set_many(
+        {alias: row[0], entity_key(model, row[0]): row},
+        settings.ENTITY_CACHE_TIMEOUT,
+    )
+    return build(model, row)
+
+
+def missing_kind(model, field):
+    return f'{model._meta.label_lower}:{field}'
+
+
+def get_or_404(model, field, value):
+    kind = missing_kind(model, field)
+    negative.check(kind, value)
+    obj = get_by(model, field, value)
+    if obj is None:
+        negative.remember(kind, value)
+        raise Http404(f'{model._meta.object_name} не найден')
+    return obj
+
+
+def get_group_or_404(slug):
+    return get_or_404(Group, 'slug', slug)
+
+
+def get_user(username):
+    return get_by(User, 'username', username)
+
+
+def get_user_or_404(username):
+    return get_or_404(User, 'username', username)
@@ -0,0 +1,56 @@
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Follow
+
+
+def following_key(user_id):
+    return f'following:{user_id}'
+
+
+def following_ids(user):
+    # Отсортированный массив id авторов, на которых подписан пользователь.
+    ids = getattr(user, '_following_ids', None)
+    if ids is not None:
+        return ids
+    key = following_key(user.pk)
+    # Без общего кеша запись сбрасывает кеш только своего процесса, и
+    # другие показывали бы старые подписки: тогда читаем из базы, один
+    # раз за запрос.
+    packed = cache.get(key) if settings.FOLLOWING_CACHE_ENABLED else None
+    if packed is None:
+        ids = array('q', Follow.objects.filter(
+            user_id=user.pk
+        ).order_by('author_id').values_list('author_id', flat=True))
+        if settings.FOLLOWING_CACHE_ENABLED:
+            cache.set(key, ids.tobytes(), settings.FOLLOWING_CACHE_TIMEOUT)
+    else:
+        ids = array('q')
+        ids.frombytes(packed)
+    user._following_ids = ids
+    return ids
+
+
+def _contains(ids, value):
+    index = bisect_left(ids, value)
+    return index < len(ids) and ids[index] == value
+
+
+def is_following(user, author):
+    if not user.is_authenticated:
+        return False
+    return _contains(following_ids(user), getattr(author, 'pk', author))
+
+
+def following_many(user, author_ids):
+    if not user.is_authenticated:
+        return {author_id: False for author_id in author_ids}
+    ids = following_ids(user)
+    return {author_id: _contains(ids, author_id) for author_id in author_ids}
+
+
+def invalidate_following(user_id):
+    cache.delete(following_key(user_id))
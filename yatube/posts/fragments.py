@@ -0,0 +1,82 @@
+import json
+import re
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.http import HttpResponse, HttpResponseBadRequest
+from django.template.loader import render_to_string
+from django.utils.cache import patch_cache_control
+
+from .readmodels import FEED_COLUMNS, post_records
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+CURSOR_RE = re.compile(r'(\d{1,18})-(\d{1,18})')
+
+
+def position(pub_date, pk):
+    # Позиция в ленте: время публикации в микросекундах и pk для постов,
+    # опубликованных в одну и ту же микросекунду.
+    delta = pub_date - EPOCH
+    micros = (
+        (delta.days * 86400 + delta.seconds) * 10 ** 6 + delta.microseconds)
+    return f'{micros}-{pk}'
+
+
+def encode_cursor(post):
+    return position(post.pub_date, post.pk)
+
+
+def decode_cursor(value):
+    match = CURSOR_RE.fullmatch(value)
+    if match is None:
+        raise ValueError(f'Неверный курсор: {value!r}')
+    micros, pk = map(int, match.groups())
+    try:
+        return EPOCH + timedelta(microseconds=micros), pk
+    except OverflowError:
+        raise ValueError(f'Курсор вне диапазона: {value!r}')
+
+
+def after(posts, cursor):
+    if cursor is None:
+        return posts
+    pub_date, pk = cursor
+    return posts.filter(
+        Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk))
+
+
+def render_fragment(request, key, posts, public=True, **card_options):
+    # Ключ кеша строится из проверенного курсора, а не из строки запроса.
+    cursor = request.GET.get('cursor', '')
+    try:
+        cursor = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        return HttpResponseBadRequest('Неверный курсор')
+    start = position(*cursor) if cursor else ''
+    cache_key = f'fragment:{key}:{start}:{settings.DEFAULT_POSTS_PER_PAGE}'
+    body = cache.get(cache_key) if public else None
+    if body is None:
+        page = after(posts, cursor)
+        size = settings.DEFAULT_POSTS_PER_PAGE
+        records = post_records(page.order_by(
+            '-pub_date', '-pk').values_list(*FEED_COLUMNS)[:size + 1])
+        has_next = len(records) > size
+        records = records[:size]
+        body = json.dumps({
+            'html': render_to_string('includes/feed_fragment.html', {
+                'posts': records, **card_options}),
+            'next': encode_cursor(records[-1]) if has_next else None,
+        })
+        if public:
+            cache.set(cache_key, body, settings.FRAGMENT_CACHE_TIMEOUT)
+    response = HttpResponse(body, content_type='application/json')
+    # Карточки одинаковы для всех, поэтому публичные ленты можно отдавать
+    # из общего кеша; подписки зависят от пользователя.
+    if public:
+        patch_cache_control(
+            response, public=True, max_age=settings.FRAGMENT_CACHE_TIMEOUT)
+    else:
+        patch_cache_control(response, private=True)
+    return response
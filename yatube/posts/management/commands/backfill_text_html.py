@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = 'Заполняет готовый HTML и анонсы у постов и комментариев.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересчитать все записи, а не только пустые.')
+
+    def handle(self, *args, **options):
+        for model, fields in (
+            (Post, ('text_html', 'excerpt', 'has_more')),
+            (Comment, ('text_html',)),
+        ):
+            queryset = model.objects.order_by('pk').only('pk', 'text')
+            if not options['all']:
+                queryset = queryset.filter(text_html='')
+            updated = self.backfill(queryset, fields, options['batch_size'])
+            self.stdout.write(
+                f'{model._meta.verbose_name_plural}: обновлено {updated}.')
+
+    def backfill(self, queryset, fields, batch_size):
+        # Идём по первичному ключу, чтобы не пропускать и не повторять
+        # записи, если пустых становится меньше по ходу работы.
+        updated = 0
+        last_pk = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                return updated
+            for obj in batch:
+                obj.render()
+            with transaction.atomic():
+                queryset.model.objects.bulk_update(batch, fields)
+            updated += len(batch)
+            last_pk = batch[-1].pk
@@ -0,0 +1,79 @@
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.template import engines
+
+from posts.models import Group, Post, User
+from posts.readmodels import FEED_COLUMNS, post_records
+
+CARDS = (
+    '{% load post_cards %}{% for post in posts %}'
+    '{% post_card post posts page_with_links=True %}{% endfor %}'
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время и память на страницу ленты: экземпляры моделей '
+        'против лёгких записей. Тестовые данные откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.prepare(options['posts'])
+            template = engines['django'].from_string(CARDS)
+            size = options['posts']
+            modes = (
+                ('models', lambda: list(Post.objects.select_related(
+                    'author', 'group').defer('text', 'text_html')[:size])),
+                ('records', lambda: post_records(
+                    Post.objects.values_list(*FEED_COLUMNS)[:size])),
+            )
+            rendered = []
+            for name, load in modes:
+                seconds, peak, html = self.measure(
+                    template, load, options['repeat'])
+                rendered.append(html)
+                self.stdout.write(
+                    f'{name:>8}: {seconds * 1000:8.2f} мс/страница  '
+                    f'пик памяти {peak / 1024:8.1f} КиБ'
+                )
+            if rendered[0] != rendered[1]:
+                self.stderr.write('Разметка страниц различается!')
+            transaction.set_rollback(True)
+
+    def prepare(self, count):
+        missing = count - Post.objects.count()
+        if missing <= 0:
+            return
+        group = Group.objects.create(
+            title='Bench', slug='bench-feed', description='Bench')
+        authors = [
+            User.objects.create_user(
+                username=f'bench_feed_{i}', first_name='Bench',
+                last_name=str(i))
+            for i in range(10)
+        ]
+        for i in range(missing):
+            Post.objects.create(
+                author=authors[i % len(authors)],
+                group=group if i % 2 else None,
+                text=f'Bench post {i} ' * 30,
+            )
+
+    def measure(self, template, load, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            html = template.render({'posts': load()})
+        seconds = (time.perf_counter() - started) / repeat
+        tracemalloc.start()
+        template.render({'posts': load()})
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return seconds, peak, html
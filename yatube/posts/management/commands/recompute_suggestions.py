@@ -0,0 +1,40 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from posts.models import User
+from posts.suggestions import recompute
+
+
+def recompute_chunk(user_ids):
+    try:
+        return recompute(user_ids)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Полностью пересчитывает рекомендации авторов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        user_ids = list(
+            User.objects.order_by('pk').values_list('pk', flat=True))
+        size = options['chunk_size']
+        chunks = [
+            user_ids[start:start + size]
+            for start in range(0, len(user_ids), size)
+        ]
+        if options['workers'] > 1:
+            with ThreadPoolExecutor(options['workers']) as executor:
+                pairs = sum(executor.map(recompute_chunk, chunks))
+        else:
+            pairs = sum(map(recompute, chunks))
+        self.stdout.write(
+            f'Пересчитано {len(user_ids)} пользователей '
+            f'({len(chunks)} порций), {pairs} пар.'
+        )
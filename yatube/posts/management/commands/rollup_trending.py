@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts.trending import TRENDING_GROUPS_KEY, TRENDING_POSTS_KEY, rollup
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает затухание популярности и топ для /trending/.'
+
+    def handle(self, *args, **options):
+        top = rollup()
+        self.stdout.write(
+            f'Популярных постов: {len(top[TRENDING_POSTS_KEY])}, '
+            f'групп: {len(top[TRENDING_GROUPS_KEY])}.'
+        )
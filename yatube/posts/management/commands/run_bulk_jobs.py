@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from posts.bulk import pending_jobs, run
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые операции из админки порциями.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int)
+        parser.add_argument(
+            '--include-failed', action='store_true',
+            help='Продолжить и задачи, завершившиеся ошибкой.')
+
+    def handle(self, *args, **options):
+        for job in pending_jobs(options['include_failed']):
+            try:
+                run(job, options['chunk_size'])
+            except Exception as error:
+                self.stderr.write(f'{job}: {error!r}')
+                continue
+            self.stdout.write(
+                f'{job}: обработано {job.processed} из ~{job.total}.')
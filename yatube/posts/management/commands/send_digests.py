@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from posts.digests import send_digests
+
+
+class Command(BaseCommand):
+    help = (
+        'Рассылает подписчикам дайджест новых постов. '
+        'Запускается по расписанию.'
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Отправлено дайджестов: {send_digests()}.')
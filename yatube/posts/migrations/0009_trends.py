@@ -0,0 +1,38 @@
+# Generated by Django 2.2.16 on 2026-10-19 19:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_followsuggestion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupTrend',
+            fields=[
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='trend', serialize=False, to='posts.Group')),
+                ('score', models.FloatField(db_index=True, default=0)),
+                ('updated', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Популярность группы',
+                'verbose_name_plural': 'Популярность групп',
+            },
+        ),
+        migrations.CreateModel(
+            name='PostTrend',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='trend', serialize=False, to='posts.Post')),
+                ('score', models.FloatField(db_index=True, default=0)),
+                ('updated', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Популярность поста',
+                'verbose_name_plural': 'Популярность постов',
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 2.2.16 on 2026-10-19 19:58
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0011_text_html'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BulkJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.CharField(choices=[('reassign_group', 'Перенос постов в группу'), ('delete_posts', 'Удаление постов'), ('delete_group', 'Удаление группы'), ('purge_user', 'Удаление пользователя и его записей')], max_length=32, verbose_name='Действие')),
+                ('params', models.TextField(default='{}', verbose_name='Параметры')),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('running', 'Выполняется'), ('done', 'Готово'), ('failed', 'Ошибка')], db_index=True, default='pending', max_length=16, verbose_name='Статус')),
+                ('stage', models.PositiveSmallIntegerField(default=0, verbose_name='Этап')),
+                ('last_pk', models.PositiveIntegerField(default=0, verbose_name='Последний ключ')),
+                ('processed', models.PositiveIntegerField(default=0, verbose_name='Обработано')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Всего')),
+                ('error', models.TextField(blank=True, verbose_name='Ошибка')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Создана')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='Обновлена')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bulk_jobs', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+            ],
+            options={
+                'verbose_name': 'Фоновая операция',
+                'verbose_name_plural': 'Фоновые операции',
+                'ordering': ('-created',),
+            },
+        ),
+    ]
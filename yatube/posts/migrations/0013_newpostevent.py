@@ -0,0 +1,30 @@
+# Generated by Django 2.2.16 on 2026-10-19 20:03
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0012_bulkjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NewPostEvent',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='new_post_events', to=settings.AUTH_USER_MODEL)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='new_post_events', to='posts.Post')),
+            ],
+            options={
+                'verbose_name': 'Новый пост для дайджеста',
+                'verbose_name_plural': 'Новые посты для дайджеста',
+                'ordering': ('pk',),
+            },
+        ),
+    ]
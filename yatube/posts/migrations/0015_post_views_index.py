@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-19 20:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0014_post_ordering_pk'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='views',
+            field=models.PositiveIntegerField(db_index=True, default=0, verbose_name='Просмотры'),
+        ),
+    ]
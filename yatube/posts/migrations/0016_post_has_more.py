@@ -0,0 +1,28 @@
+# Generated by Django 2.2.16 on 2026-10-19 20:27
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Length
+
+
+def fill_has_more(apps, schema_editor):
+    # Одним UPDATE: у существующих постов текст не перерисовывается.
+    Post = apps.get_model('posts', 'Post')
+    Post.objects.annotate(length=Length('text')).filter(
+        length__gt=settings.POST_EXCERPT_LENGTH).update(has_more=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0015_post_views_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='has_more',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(fill_has_more, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.db import migrations
+
+from posts.utils import render_excerpt, render_text
+
+BATCH_SIZE = 500
+
+
+def fill_rendered_text(apps, schema_editor):
+    # То же, что делает backfill_text_html, чтобы старые записи не
+    # показывались пустыми карточками до ручного запуска команды.
+    Post = apps.get_model('posts', 'Post')
+    Comment = apps.get_model('posts', 'Comment')
+    last_pk = 0
+    while True:
+        posts = list(Post.objects.filter(excerpt='', pk__gt=last_pk).order_by(
+            'pk').only('pk', 'text')[:BATCH_SIZE])
+        if not posts:
+            break
+        for post in posts:
+            post.text_html = render_text(post.text)
+            post.excerpt = render_excerpt(post.text)
+            post.has_more = len(post.text) > settings.POST_EXCERPT_LENGTH
+        Post.objects.bulk_update(posts, ('text_html', 'excerpt', 'has_more'))
+        last_pk = posts[-1].pk
+    last_pk = 0
+    while True:
+        comments = list(Comment.objects.filter(
+            text_html='', pk__gt=last_pk).order_by('pk').only(
+            'pk', 'text')[:BATCH_SIZE])
+        if not comments:
+            break
+        for comment in comments:
+            comment.text_html = render_text(comment.text)
+        Comment.objects.bulk_update(comments, ('text_html',))
+        last_pk = comments[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0016_post_has_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_rendered_text, migrations.RunPython.noop),
+    ]
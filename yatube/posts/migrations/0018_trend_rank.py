@@ -0,0 +1,47 @@
+import math
+
+from django.conf import settings
+from django.db import migrations
+
+
+def scores_to_ranks(apps, schema_editor):
+    # Счёт на момент updated превращается в ранг, приведённый к эпохе.
+    for name in ('PostTrend', 'GroupTrend'):
+        model = apps.get_model('posts', name)
+        model.objects.filter(rank__lte=0).delete()
+        trends = list(model.objects.all())
+        for trend in trends:
+            trend.rank = math.log2(trend.rank) + (
+                trend.updated.timestamp() / settings.TRENDING_HALF_LIFE)
+        model.objects.bulk_update(trends, ('rank',), batch_size=500)
+
+
+def ranks_to_scores(apps, schema_editor):
+    for name in ('PostTrend', 'GroupTrend'):
+        model = apps.get_model('posts', name)
+        trends = list(model.objects.all())
+        for trend in trends:
+            trend.rank = 2 ** (trend.rank - (
+                trend.updated.timestamp() / settings.TRENDING_HALF_LIFE))
+        model.objects.bulk_update(trends, ('rank',), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0017_fill_rendered_text'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='posttrend',
+            old_name='score',
+            new_name='rank',
+        ),
+        migrations.RenameField(
+            model_name='grouptrend',
+            old_name='score',
+            new_name='rank',
+        ),
+        migrations.RunPython(scores_to_ranks, ranks_to_scores),
+    ]
@@ -2,6 +2,8 @@ from django.contrib.auth import get_user_model
 from django.db import models
 from django.conf import settings
 
+from .utils import render_excerpt, render_text
+
 User = get_user_model()
 
 
@@ -38,15 +40,30 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    views = models.PositiveIntegerField(
+        'Просмотры', default=0, db_index=True)
+    text_html = models.TextField(blank=True, editable=False)
+    excerpt = models.TextField(blank=True, editable=False)
+    # Считается при сохранении, чтобы лентам не нужен был полный текст.
+    has_more = models.BooleanField(default=False, editable=False)
 
     class Meta:
         verbose_name = 'Post'
         verbose_name_plural = 'Posts'
-        ordering = ('-pub_date',)
+        ordering = ('-pub_date', '-pk')
 
     def __str__(self) -> str:
         return f'{self.text[:settings.DEFAULT_POSTS_PER_PAGE]}'
 
+    def save(self, *args, **kwargs):
+        self.render()
+        super().save(*args, **kwargs)
+
+    def render(self):
+        self.text_html = render_text(self.text)
+        self.excerpt = render_excerpt(self.text)
+        self.has_more = len(self.text) > settings.POST_EXCERPT_LENGTH
+
 
 class Comment(models.Model):
     post = models.ForeignKey(
@@ -68,12 +85,20 @@ class Comment(models.Model):
         help_text='Напишите комментарий'
     )
     created = models.DateTimeField(auto_now_add=True)
+    text_html = models.TextField(blank=True, editable=False)
 
     class Meta:
         ordering = ('-created',)
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
 
+    def save(self, *args, **kwargs):
+        self.render()
+        super().save(*args, **kwargs)
+
+    def render(self):
+        self.text_html = render_text(self.text)
+
 
 class Follow(models.Model):
     user = models.ForeignKey(User, related_name='follower',
@@ -87,3 +112,104 @@ class Follow(models.Model):
         verbose_name_plural = 'Все подписки'
         constraints = [models.UniqueConstraint(
             fields=['user', 'author'], name='unique_members')]
+
+
+class FollowSuggestion(models.Model):
+    user = models.ForeignKey(User, related_name='suggestions',
+                             on_delete=models.CASCADE)
+    candidate = models.ForeignKey(User, related_name='suggested_to',
+                                  on_delete=models.CASCADE)
+    score = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Рекомендация'
+        verbose_name_plural = 'Рекомендации авторов'
+        constraints = [models.UniqueConstraint(
+            fields=['user', 'candidate'], name='unique_suggestion')]
+        indexes = [models.Index(
+            fields=['user', '-score'], name='suggestion_user_score')]
+
+
+class PostTrend(models.Model):
+    post = models.OneToOneField(Post, primary_key=True,
+                                related_name='trend',
+                                on_delete=models.CASCADE)
+    # log2 счёта, приведённый к эпохе: см. posts.trending.
+    rank = models.FloatField(default=0, db_index=True)
+    updated = models.DateTimeField()
+
+    class Meta:
+        verbose_name = 'Популярность поста'
+        verbose_name_plural = 'Популярность постов'
+
+
+class GroupTrend(models.Model):
+    group = models.OneToOneField(Group, primary_key=True,
+                                 related_name='trend',
+                                 on_delete=models.CASCADE)
+    rank = models.FloatField(default=0, db_index=True)
+    updated = models.DateTimeField()
+
+    class Meta:
+        verbose_name = 'Популярность группы'
+        verbose_name_plural = 'Популярность групп'
+
+
+class BulkJob(models.Model):
+    REASSIGN_GROUP = 'reassign_group'
+    DELETE_POSTS = 'delete_posts'
+    DELETE_GROUP = 'delete_group'
+    PURGE_USER = 'purge_user'
+    ACTIONS = (
+        (REASSIGN_GROUP, 'Перенос постов в группу'),
+        (DELETE_POSTS, 'Удаление постов'),
+        (DELETE_GROUP, 'Удаление группы'),
+        (PURGE_USER, 'Удаление пользователя и его записей'),
+    )
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Готово'),
+        (FAILED, 'Ошибка'),
+    )
+
+    action = models.CharField('Действие', max_length=32, choices=ACTIONS)
+    params = models.TextField('Параметры', default='{}')
+    status = models.CharField(
+        'Статус', max_length=16, choices=STATUSES, default=PENDING,
+        db_index=True)
+    stage = models.PositiveSmallIntegerField('Этап', default=0)
+    last_pk = models.PositiveIntegerField('Последний ключ', default=0)
+    processed = models.PositiveIntegerField('Обработано', default=0)
+    total = models.PositiveIntegerField('Всего', default=0)
+    error = models.TextField('Ошибка', blank=True)
+    created_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='bulk_jobs', verbose_name='Автор')
+    created = models.DateTimeField('Создана', auto_now_add=True)
+    updated = models.DateTimeField('Обновлена', auto_now=True)
+
+    class Meta:
+        ordering = ('-created',)
+        verbose_name = 'Фоновая операция'
+        verbose_name_plural = 'Фоновые операции'
+
+    def __str__(self) -> str:
+        return f'{self.get_action_display()} №{self.pk}'
+
+
+class NewPostEvent(models.Model):
+    post = models.ForeignKey(Post, on_delete=models.CASCADE,
+                             related_name='new_post_events')
+    author = models.ForeignKey(User, on_delete=models.CASCADE,
+                               related_name='new_post_events')
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ('pk',)
+        verbose_name = 'Новый пост для дайджеста'
+        verbose_name_plural = 'Новые посты для дайджеста'
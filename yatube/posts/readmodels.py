@@ -0,0 +1,134 @@
+from django.conf import settings
+
+from .models import Group, Post, User
+from .utils import base_paginator
+
+# Колонки, которых хватает карточке поста в ленте; порядок важен для
+# распаковки строк values_list. Полный текст лента не читает.
+FEED_COLUMNS = (
+    'id', 'excerpt', 'has_more', 'pub_date', 'image', 'views',
+    'author_id', 'author__username', 'author__first_name',
+    'author__last_name', 'group_id', 'group__title', 'group__slug',
+)
+
+
+class Record:
+    # Лёгкая замена экземпляру модели только для чтения: равна экземпляру
+    # своей модели с тем же pk, поэтому контекст сравним с объектами ORM.
+    __slots__ = ('pk',)
+    model = None
+
+    @property
+    def id(self):
+        return self.pk
+
+    def __eq__(self, other):
+        if isinstance(other, (type(self), self.model)):
+            return self.pk == other.pk
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.pk)
+
+    def __repr__(self):
+        return f'<{type(self).__name__}: {self.pk}>'
+
+
+class AuthorRecord(Record):
+    __slots__ = ('username', 'first_name', 'last_name')
+    model = User
+
+    def __init__(self, pk, username, first_name, last_name):
+        self.pk = pk
+        self.username = username
+        self.first_name = first_name
+        self.last_name = last_name
+
+    def __str__(self):
+        return self.username
+
+    def get_username(self):
+        return self.username
+
+    def get_full_name(self):
+        return f'{self.first_name} {self.last_name}'.strip()
+
+
+class GroupRecord(Record):
+    __slots__ = ('title', 'slug')
+    model = Group
+
+    def __init__(self, pk, title, slug):
+        self.pk = pk
+        self.title = title
+        self.slug = slug
+
+    def __str__(self):
+        return f'{self.title}'
+
+
+class PostRecord(Record):
+    __slots__ = (
+        '_text', 'excerpt', 'has_more', 'pub_date', 'image', 'views',
+        'author', 'group',
+    )
+    model = Post
+
+    def __init__(self, pk, excerpt, has_more, pub_date, image, views, author,
+                 group):
+        self.pk = pk
+        self._text = None
+        self.excerpt = excerpt
+        self.has_more = has_more
+        self.pub_date = pub_date
+        # Имя файла: сравнивается с FieldFile и подходит тегу thumbnail.
+        self.image = image
+        self.views = views
+        self.author = author
+        self.group = group
+
+    def __str__(self):
+        return f'{self.text[:settings.DEFAULT_POSTS_PER_PAGE]}'
+
+    @property
+    def text(self):
+        # Как отложенное поле модели: читается отдельным запросом
+        # только при обращении, карточки ленты его не используют.
+        if self._text is None:
+            self._text = Post.objects.values_list(
+                'text', flat=True).get(pk=self.pk)
+        return self._text
+
+    @property
+    def author_id(self):
+        return self.author.pk
+
+    @property
+    def group_id(self):
+        return self.group.pk if self.group else None
+
+
+def post_records(rows):
+    authors = {}
+    groups = {}
+    records = []
+    for (pk, excerpt, has_more, pub_date, image, views, author_id, username,
+         first_name, last_name, group_id, title, slug) in rows:
+        author = authors.get(author_id)
+        if author is None:
+            author = authors[author_id] = AuthorRecord(
+                author_id, username, first_name, last_name)
+        group = None
+        if group_id is not None:
+            group = groups.get(group_id)
+            if group is None:
+                group = groups[group_id] = GroupRecord(group_id, title, slug)
+        records.append(PostRecord(
+            pk, excerpt, has_more, pub_date, image, views, author, group))
+    return records
+
+
+def feed_page(request, posts):
+    page = base_paginator(request, posts.values_list(*FEED_COLUMNS))
+    page.object_list = post_records(page.object_list)
+    return page
@@ -0,0 +1,74 @@
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from core import negative
+
+from . import digests, entities, suggestions, trending
+from .follows import invalidate_following
+from .models import Comment, Follow, Group, Post, User
+from .tasks import warm_thumbnails
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def follow_changed(sender, instance, **kwargs):
+    invalidate_following(instance.user_id)
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, **kwargs):
+    if created:
+        suggestions.follow_changed(instance.user_id, instance.author_id, 1)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    suggestions.follow_changed(instance.user_id, instance.author_id, -1)
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, **kwargs):
+    if created and instance.post_id:
+        suggestions.comment_added(instance.post_id, instance.author_id)
+        trending.comment_created(instance)
+
+
+@receiver(pre_delete, sender=Comment)
+def comment_deleting(sender, instance, **kwargs):
+    if instance.post_id:
+        suggestions.comment_removing(instance.post_id)
+
+
+@receiver(post_save, sender=User)
+def user_created(sender, instance, created, **kwargs):
+    # Не доверяем записи в кеше, оставшейся от пользователя с тем же pk.
+    if created:
+        invalidate_following(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def post_created(sender, instance, created, **kwargs):
+    if created:
+        trending.post_created(instance)
+        digests.record(instance)
+        negative.forget('posts.post', instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, **kwargs):
+    if instance.image:
+        warm_thumbnails.delay(instance.pk)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    cache.delete(entities.GROUP_CHOICES_KEY)
+    entities.invalidate(Group, instance)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    entities.invalidate(User, instance)
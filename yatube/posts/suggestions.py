@@ -0,0 +1,129 @@
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F
+
+from .follows import following_ids
+from .models import Comment, Follow, FollowSuggestion
+
+_pending = threading.local()
+
+
+def shift(weight, others, **fixed):
+    # Сдвигает счёт всех пар, у которых один конец задан в fixed
+    # (user_id или candidate_id), а другой берётся из подзапроса others.
+    # Число запросов не зависит от числа подписчиков; вызывается внутри
+    # транзакции.
+    (fixed_field, fixed_id), = fixed.items()
+    other_field = 'candidate_id' if fixed_field == 'user_id' else 'user_id'
+    suggestions = FollowSuggestion.objects.filter(
+        **fixed, **{f'{other_field}__in': others})
+    if weight > 0:
+        known = set(suggestions.values_list(other_field, flat=True))
+        FollowSuggestion.objects.bulk_create(
+            [
+                FollowSuggestion(**fixed, **{other_field: other_id})
+                for other_id in set(others)
+                if other_id not in known and other_id != fixed_id
+            ],
+            ignore_conflicts=True,
+        )
+    suggestions.update(score=F('score') + weight)
+    if weight < 0:
+        suggestions.filter(score__lte=0).delete()
+
+
+def follow_changed(user_id, author_id, sign):
+    weight = sign * settings.SUGGESTION_FOLLOW_WEIGHT
+    with transaction.atomic():
+        # user -> author -> кандидат.
+        shift(weight, Follow.objects.filter(user_id=author_id).values_list(
+            'author_id', flat=True), user_id=user_id)
+        # подписчик -> user -> author.
+        shift(weight, Follow.objects.filter(author_id=user_id).values_list(
+            'user_id', flat=True), candidate_id=author_id)
+
+
+def comment_added(post_id, author_id):
+    own_comments = Comment.objects.filter(
+        post_id=post_id, author_id=author_id).count()
+    # Учитываем только первый комментарий автора под постом.
+    if own_comments != 1:
+        return
+    weight = settings.SUGGESTION_COMMENT_WEIGHT
+    others = Comment.objects.filter(post_id=post_id).exclude(
+        author_id=author_id).order_by().values_list(
+        'author_id', flat=True).distinct()
+    with transaction.atomic():
+        shift(weight, others, user_id=author_id)
+        shift(weight, others, candidate_id=author_id)
+
+
+def comment_removing(post_id):
+    # Вызывается до удаления. При удалении поста или пачки комментариев
+    # к post_delete соседние комментарии уже удалены и пошаговый
+    # пересчёт их не видит. Поэтому счёт всех комментаторов поста
+    # пересчитывается заново после коммита, одной задачей на транзакцию.
+    # started: в этой транзакции задача ещё не запланирована или откачена.
+    started = not any(
+        func is schedule_recompute for _, func in connection.run_on_commit)
+    if started:
+        _pending.posts = set()
+        _pending.users = set()
+    if post_id not in _pending.posts:
+        _pending.posts.add(post_id)
+        _pending.users.update(Comment.objects.filter(
+            post_id=post_id).values_list('author_id', flat=True))
+    if started:
+        transaction.on_commit(schedule_recompute)
+
+
+def schedule_recompute():
+    from .tasks import recompute_suggestions
+
+    users = sorted(_pending.users)
+    if users:
+        recompute_suggestions.delay(users)
+
+
+def suggested_authors(user, limit=None):
+    if not user.is_authenticated:
+        return []
+    return list(FollowSuggestion.objects.filter(user_id=user.pk).exclude(
+        candidate_id__in=list(following_ids(user))
+    ).select_related('candidate').order_by('-score')[
+        :limit or settings.SUGGESTIONS_LIMIT])
+
+
+def compute_scores(user_ids):
+    scores = Counter()
+    paths = Follow.objects.filter(user_id__in=user_ids).values_list(
+        'user_id', 'author__follower__author_id'
+    ).annotate(paths=Count('author_id')).order_by()
+    for user_id, candidate_id, count in paths:
+        if candidate_id is not None:
+            scores[(user_id, candidate_id)] += (
+                count * settings.SUGGESTION_FOLLOW_WEIGHT)
+    shared = Comment.objects.filter(
+        author_id__in=user_ids, post__isnull=False
+    ).values_list('author_id', 'post__comments__author_id').annotate(
+        posts=Count('post_id', distinct=True)).order_by()
+    for user_id, candidate_id, count in shared:
+        scores[(user_id, candidate_id)] += (
+            count * settings.SUGGESTION_COMMENT_WEIGHT)
+    return scores
+
+
+def recompute(user_ids):
+    scores = compute_scores(user_ids)
+    with transaction.atomic():
+        FollowSuggestion.objects.filter(user_id__in=user_ids).delete()
+        FollowSuggestion.objects.bulk_create(
+            FollowSuggestion(
+                user_id=user_id, candidate_id=candidate_id, score=score)
+            for (user_id, candidate_id), score in scores.items()
+            if user_id != candidate_id and score > 0
+        )
+    return len(scores)
@@ -0,0 +1,38 @@
+from django.conf import settings
+from sorl.thumbnail import get_thumbnail
+
+from core.tasks import task
+
+from . import bulk, digests, suggestions
+from .models import BulkJob, Post
+
+
+@task(priority=-1)
+def run_bulk_job(job_id):
+    # Ограниченное число порций за раз, затем снова в очередь: длинная
+    # операция не занимает воркер и не превышает TASK_LOCK_TIMEOUT.
+    job = BulkJob.objects.filter(
+        pk=job_id, status__in=(BulkJob.PENDING, BulkJob.RUNNING)).first()
+    if job is None:
+        return
+    for _ in range(settings.BULK_JOB_CHUNKS_PER_TASK):
+        if not bulk.run_chunk(job):
+            return
+    run_bulk_job.delay(job_id)
+
+
+@task(priority=1)
+def warm_thumbnails(post_id):
+    post = Post.objects.filter(pk=post_id).only('image').first()
+    if post and post.image:
+        get_thumbnail(post.image, '960x339', crop='center', upscale=True)
+
+
+@task()
+def send_digests():
+    digests.send_digests()
+
+
+@task()
+def recompute_suggestions(user_ids):
+    suggestions.recompute(user_ids)
@@ -0,0 +1,55 @@
+from urllib.parse import quote
+
+from django import template
+from django.urls import reverse
+from django.utils.http import RFC3986_SUBDELIMS
+
+from posts.fragments import encode_cursor
+
+register = template.Library()
+
+CARD_TEMPLATE = 'includes/post.html'
+PLACEHOLDER = '98765432109876543210'
+
+
+def url_pattern(name):
+    # Разворачиваем маршрут один раз, дальше только подставляем значение.
+    prefix, suffix = reverse(name, args=[PLACEHOLDER]).split(PLACEHOLDER)
+    return lambda value: prefix + quote(
+        str(value), safe=RFC3986_SUBDELIMS + '/~:@') + suffix
+
+
+def prepare_cards(posts):
+    profile_url = url_pattern('posts:profile')
+    detail_url = url_pattern('posts:post_detail')
+    group_url = url_pattern('posts:group_list')
+    cards = {}
+    for post in posts:
+        author = post.author
+        cards[post.pk] = {
+            'full_name': author.get_full_name(),
+            'profile_url': profile_url(author.get_username()),
+            'detail_url': detail_url(post.pk),
+            'group_url': group_url(post.group.slug) if post.group_id else '',
+        }
+    return cards
+
+
+@register.simple_tag(takes_context=True)
+def post_card(context, post, posts, page_with_links=False, is_profile=False):
+    state = context.render_context.setdefault(CARD_TEMPLATE, {})
+    if 'template' not in state:
+        state['template'] = context.template.engine.get_template(
+            CARD_TEMPLATE)
+    cards = state.get(id(posts))
+    if cards is None or post.pk not in cards:
+        cards = state[id(posts)] = prepare_cards(posts)
+    with context.push(post=post, card=cards[post.pk],
+                      page_with_links=page_with_links, is_profile=is_profile):
+        return state['template'].render(context)
+
+
+@register.filter
+def feed_cursor(page):
+    posts = page.object_list
+    return encode_cursor(posts[len(posts) - 1]) if posts else ''
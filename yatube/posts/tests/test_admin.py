@@ -0,0 +1,70 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post, User
+
+# Запросов на страницу списка в админке при любом размере таблицы:
+# первый показ с пустым кешем и повторный, когда счётчик уже в кеше.
+ADMIN_QUERY_BUDGETS = {
+    'admin:posts_post_changelist': (5, 3),
+    'admin:posts_comment_changelist': (4, 3),
+    'admin:posts_follow_changelist': (4, 3),
+    'admin:posts_group_changelist': (4, 3),
+    'admin:posts_bulkjob_changelist': (4, 3),
+}
+
+
+class AdminQueryBudgetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            'budget_admin', 'admin@example.com', 'password')
+        groups = [
+            Group.objects.create(
+                title=f'Группа {i}', slug=f'admin-{i}', description='-')
+            for i in range(5)
+        ]
+        authors = [
+            User.objects.create_user(username=f'admin_author_{i}')
+            for i in range(5)
+        ]
+        Post.objects.bulk_create(
+            Post(author=authors[i % 5], group=groups[i % 5], text=f'Пост {i}')
+            for i in range(60)
+        )
+        posts = list(Post.objects.all()[:5])
+        Comment.objects.bulk_create(
+            Comment(post=posts[i % 5], author=authors[i % 5], text='Да')
+            for i in range(60)
+        )
+        Follow.objects.bulk_create(
+            Follow(user=user, author=author)
+            for user in authors for author in authors if user != author
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.admin)
+
+    def test_changelist_budgets(self):
+        for name, budgets in ADMIN_QUERY_BUDGETS.items():
+            for budget in budgets:
+                with self.subTest(name=name, budget=budget):
+                    with CaptureQueriesContext(connection) as queries:
+                        response = self.client.get(reverse(name))
+                    self.assertEqual(response.status_code, 200)
+                    sql = '\n'.join(
+                        query['sql'] for query in queries.captured_queries)
+                    self.assertLessEqual(
+                        len(queries.captured_queries), budget, sql)
+
+    def test_group_choices_follow_changes(self):
+        url = reverse('admin:posts_post_changelist')
+        self.client.get(url)
+        Group.objects.create(title='Новая группа', slug='new-admin')
+        self.assertContains(self.client.get(url), 'Новая группа')
@@ -0,0 +1,127 @@
+from django.contrib.auth.models import Permission
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.tasks import run_worker
+from posts import bulk
+from posts.models import BulkJob, Comment, Follow, Group, Post, User
+
+
+class BulkJobTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            'bulk_admin', 'admin@example.com', 'password')
+        cls.old = Group.objects.create(title='Old', slug='old')
+        cls.new = Group.objects.create(title='New', slug='new')
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='bulk_user')
+        self.other = User.objects.create_user(username='bulk_other')
+        self.posts = [
+            Post.objects.create(author=self.user, group=self.old, text='Да')
+            for _ in range(7)
+        ]
+        Comment.objects.create(
+            post=self.posts[0], author=self.other, text='Чужой')
+        Comment.objects.create(
+            post=Post.objects.create(author=self.other, text='Нет'),
+            author=self.user, text='Свой')
+        Follow.objects.create(user=self.user, author=self.other)
+        Follow.objects.create(user=self.other, author=self.user)
+
+    def test_reassign_resumes_from_cursor(self):
+        job = bulk.enqueue(
+            BulkJob.REASSIGN_GROUP,
+            post_ids=[post.pk for post in self.posts],
+            group_id=self.new.pk,
+        )
+        bulk.run_chunk(job, size=3)
+        job = BulkJob.objects.get(pk=job.pk)
+        self.assertEqual(
+            (job.status, job.processed, job.last_pk),
+            (BulkJob.RUNNING, 3, self.posts[2].pk),
+        )
+        self.assertEqual(self.new.posts.count(), 3)
+        bulk.run(job, size=3)
+        self.assertEqual(job.status, BulkJob.DONE)
+        self.assertEqual(self.new.posts.count(), 7)
+        self.assertEqual(job.processed, 7)
+
+    def test_purge_user(self):
+        bulk.run(bulk.enqueue(BulkJob.PURGE_USER, user_id=self.user.pk), 2)
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+        self.assertEqual(Post.objects.count(), 1)
+        self.assertFalse(Comment.objects.exists())
+        self.assertFalse(Follow.objects.exists())
+
+    def test_delete_group_keeps_posts(self):
+        bulk.run(bulk.enqueue(BulkJob.DELETE_GROUP, group_id=self.old.pk))
+        self.assertFalse(Group.objects.filter(pk=self.old.pk).exists())
+        self.assertEqual(Post.objects.filter(group=None).count(), 8)
+
+    def test_admin_queues_instead_of_deleting(self):
+        client = Client()
+        client.force_login(self.admin)
+        response = client.post(reverse('admin:posts_post_changelist'), {
+            'action': 'queue_delete_posts',
+            '_selected_action': [post.pk for post in self.posts[:2]],
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Post.objects.count(), 8)
+        job = BulkJob.objects.get()
+        self.assertEqual((job.action, job.total, job.created_by),
+                         (BulkJob.DELETE_POSTS, 2, self.admin))
+        bulk.run(job)
+        self.assertEqual(Post.objects.count(), 6)
+
+    @override_settings(BULK_JOB_CHUNK_SIZE=2, BULK_JOB_CHUNKS_PER_TASK=1)
+    def test_worker_runs_job_in_slices(self):
+        job = bulk.enqueue(
+            BulkJob.DELETE_POSTS, post_ids=[post.pk for post in self.posts])
+        self.assertEqual(run_worker(until_empty=True), 6)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed), (BulkJob.DONE, 7))
+        self.assertEqual(Post.objects.count(), 1)
+
+    def test_admin_delete_view_queues(self):
+        client = Client()
+        client.force_login(self.admin)
+        cases = (
+            ('admin:posts_post_delete', self.posts[0],
+             BulkJob.DELETE_POSTS),
+            ('admin:posts_group_delete', self.old, BulkJob.DELETE_GROUP),
+            ('admin:auth_user_delete', self.user, BulkJob.PURGE_USER),
+        )
+        for name, obj, action in cases:
+            with self.subTest(name=name):
+                url = reverse(name, args=[obj.pk])
+                self.assertContains(client.get(url), str(obj))
+                response = client.post(url, {'post': 'yes'})
+                self.assertEqual(response.status_code, 302)
+                self.assertTrue(type(obj).objects.filter(pk=obj.pk).exists())
+                job = BulkJob.objects.latest('pk')
+                self.assertEqual((job.action, job.created_by),
+                                 (action, self.admin))
+        self.assertEqual(Post.objects.count(), 8)
+
+    def test_queueing_needs_related_permissions(self):
+        staff = User.objects.create_user(username='bulk_staff', is_staff=True)
+        staff.user_permissions.set(Permission.objects.filter(
+            codename__in=('view_user', 'delete_user',
+                          'view_group', 'delete_group')))
+        client = Client()
+        client.force_login(staff)
+        for name, obj in (('admin:auth_user_delete', self.other),
+                          ('admin:posts_group_delete', self.old)):
+            with self.subTest(name=name):
+                url = reverse(name, args=[obj.pk])
+                self.assertTrue(client.get(url).context['perms_lacking'])
+                response = client.post(url, {'post': 'yes'})
+                self.assertEqual(response.status_code, 403)
+        response = client.post(reverse('admin:auth_user_changelist'), {
+            'action': 'queue_purge', '_selected_action': [self.other.pk],
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(BulkJob.objects.exists())
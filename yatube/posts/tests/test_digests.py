@@ -0,0 +1,43 @@
+from django.core import mail
+from django.test import TestCase, override_settings
+
+from posts.digests import send_digests
+from posts.models import Follow, NewPostEvent, Post, User
+
+
+@override_settings(DIGEST_BATCH_SIZE=2, DIGEST_MAX_POSTS=2)
+class DigestTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.authors = [
+            User.objects.create_user(username=f'digest_author_{i}')
+            for i in range(2)
+        ]
+        cls.readers = [
+            User.objects.create_user(
+                username=f'digest_reader_{i}',
+                email=f'reader{i}@example.com' if i else '')
+            for i in range(4)
+        ]
+        for reader in cls.readers:
+            Follow.objects.create(user=reader, author=cls.authors[0])
+        Follow.objects.create(user=cls.readers[1], author=cls.authors[1])
+
+    def test_one_digest_per_recipient(self):
+        for number in range(3):
+            Post.objects.create(author=self.authors[0], text=f'Пост {number}')
+        Post.objects.create(author=self.authors[1], text='Другой автор')
+        # Последнее событие, получатели; на каждую из двух пачек —
+        # точка сохранения, пары «подписчик — пост» и её освобождение;
+        # тексты постов один раз; удаление событий.
+        with self.assertNumQueries(10):
+            self.assertEqual(send_digests(), 3)
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            [f'reader{i}@example.com' for i in range(1, 4)])
+        body = next(message.body for message in mail.outbox
+                    if message.to == ['reader1@example.com'])
+        self.assertEqual(body.count('/posts/'), 2)
+        self.assertFalse(NewPostEvent.objects.exists())
+        self.assertEqual(send_digests(), 0)
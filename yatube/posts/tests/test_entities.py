@@ -0,0 +1,55 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from posts import entities
+from posts.models import Group, User
+
+
+class EntityCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Entity', slug='entity', description='Описание')
+        cls.users = [
+            User.objects.create_user(
+                username=f'entity_{i}', email=f'entity{i}@example.com')
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_lookup_is_cached(self):
+        with self.assertNumQueries(1):
+            entities.get_group_or_404('entity')
+        with self.assertNumQueries(0):
+            group = entities.get_group_or_404('entity')
+        self.assertEqual(group, self.group)
+        self.assertEqual(group.description, 'Описание')
+
+    def test_get_many_fetches_only_misses(self):
+        entities.get_user('entity_0')
+        pks = [user.pk for user in self.users]
+        with self.assertNumQueries(1):
+            users = entities.get_many(User, pks)
+        self.assertEqual([users[pk] for pk in pks], self.users)
+        with self.assertNumQueries(0):
+            entities.get_many(User, pks)
+
+    def test_invalidated_on_save(self):
+        entities.get_group_or_404('entity')
+        self.group.slug = 'renamed'
+        self.group.save()
+        self.assertEqual(
+            entities.get_group_or_404('renamed').slug, 'renamed')
+        with self.assertRaises(entities.Http404):
+            entities.get_group_or_404('entity')
+
+    def test_deferred_fields_are_not_lost(self):
+        user = entities.get_user('entity_1')
+        user.first_name = 'Новое'
+        user.save()
+        user = User.objects.get(pk=user.pk)
+        self.assertEqual(
+            (user.first_name, user.email), ('Новое', 'entity1@example.com'))
@@ -0,0 +1,131 @@
+import json
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.fragments import decode_cursor, encode_cursor
+from posts.models import Follow, Group, Post, User
+
+
+@override_settings(DEFAULT_POSTS_PER_PAGE=4)
+class FragmentTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='scroller')
+        cls.author = User.objects.create_user(username='scroll_author')
+        cls.group = Group.objects.create(
+            title='Лента', slug='scroll', description='Описание')
+        posts = [
+            Post(author=cls.author, group=cls.group, text=f'Пост {i}')
+            for i in range(10)
+        ]
+        # bulk_create не вызывает save(): анонсы готовим сами.
+        for post in posts:
+            post.render()
+        Post.objects.bulk_create(posts)
+        # Одинаковое время публикации: порядок держится только на pk.
+        Post.objects.filter(pk__in=list(
+            Post.objects.values_list('pk', flat=True)[:6])).update(
+            pub_date=timezone.now())
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_cursor_round_trip(self):
+        post = Post.objects.first()
+        self.assertEqual(
+            decode_cursor(encode_cursor(post)), (post.pub_date, post.pk))
+
+    def test_fragments_continue_feed(self):
+        expected = list(Post.objects.values_list('pk', flat=True))
+        self.client.force_login(self.user)
+        for name, kwargs in (
+            ('index', {}),
+            ('profile', {'username': self.author.username}),
+            ('follow', {}),
+        ):
+            with self.subTest(name=name):
+                response = self.client.get(
+                    reverse(f'posts:{name}_fragment', kwargs=kwargs))
+                self.assertEqual(response.status_code, 200)
+                pages = []
+                cursor = ''
+                while cursor is not None:
+                    response = self.client.get(
+                        reverse(f'posts:{name}_fragment', kwargs=kwargs),
+                        {'cursor': cursor})
+                    data = json.loads(response.content)
+                    pages.append(data['html'])
+                    cursor = data['next']
+                self.assertEqual(len(pages), 3)
+                html = ''.join(pages)
+                positions = [html.index(f'/posts/{pk}/') for pk in expected]
+                self.assertEqual(positions, sorted(positions))
+
+    def test_page_links_to_next_fragment(self):
+        response = self.client.get(
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}))
+        last = response.context['page_obj'].object_list[-1]
+        self.assertContains(response, 'class="js-feed-more"')
+        self.assertContains(response, f'data-cursor="{encode_cursor(last)}"')
+        response = self.client.get(
+            reverse('posts:group_fragment', kwargs={'slug': self.group.slug}),
+            {'cursor': encode_cursor(last)})
+        data = json.loads(response.content)
+        second_page = self.client.get(
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            {'page': 2}).context['page_obj']
+        for post in second_page:
+            self.assertIn(post.text, data['html'])
+        self.assertIsNotNone(data['next'])
+
+    def test_invalid_cursor(self):
+        for cursor in ('abc', '1-2-3', '12', '-1-2', '1-',
+                       '999999999999999999-1', '99999999999999999999999-1'):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(
+                    reverse('posts:index_fragment'), {'cursor': cursor})
+                self.assertEqual(response.status_code, 400)
+
+    def test_cache_headers(self):
+        response = self.client.get(reverse('posts:index_fragment'))
+        self.assertIn('public', response['Cache-Control'])
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('posts:follow_fragment'))
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_follow_fragment_requires_login(self):
+        response = self.client.get(reverse('posts:follow_fragment'))
+        self.assertRedirects(
+            response, f'/auth/login/?next={reverse("posts:follow_fragment")}')
+
+    def test_public_fragment_cached(self):
+        url = reverse('posts:index_fragment')
+        first = self.client.get(url).content
+        Post.objects.create(author=self.author, text='Свежий пост')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).content, first)
+
+    def test_cache_key_built_from_decoded_cursor(self):
+        url = reverse('posts:index_fragment')
+        cursor = encode_cursor(Post.objects.all()[5])
+        first = self.client.get(url, {'cursor': cursor}).content
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self.client.get(url, {'cursor': '0' + cursor}).content,
+                first)
+
+    def test_index_cursor_cached_with_cards(self):
+        url = reverse('posts:index_page')
+        first = self.client.get(url)
+        Post.objects.create(author=self.author, text='Свежий пост')
+        second = self.client.get(url)
+        cards = first.context['page_obj'].object_list
+        self.assertNotContains(second, 'Свежий пост')
+        self.assertContains(
+            second, f'data-cursor="{encode_cursor(cards[-1])}"')
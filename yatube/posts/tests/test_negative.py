@@ -0,0 +1,44 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+
+
+class NegativeCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def assert_cached_miss(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 404)
+        self.assertTemplateUsed(response, 'core/404.html')
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 404)
+        self.assertContains(response, 'Custom 404', status_code=404)
+
+    def test_misses_are_cached(self):
+        for url in (
+            reverse('posts:profile', kwargs={'username': 'ghost'}),
+            reverse('posts:group_list', kwargs={'slug': 'ghost'}),
+            reverse('posts:post_detail', kwargs={'post_id': 999}),
+        ):
+            with self.subTest(url=url):
+                self.assert_cached_miss(url)
+
+    def test_created_objects_clear_misses(self):
+        urls = {
+            'user': reverse('posts:profile', kwargs={'username': 'late'}),
+            'group': reverse('posts:group_list', kwargs={'slug': 'late'}),
+        }
+        for url in urls.values():
+            self.client.get(url)
+        user = User.objects.create_user(username='late')
+        Group.objects.create(title='Late', slug='late', description='-')
+        post = Post.objects.create(author=user, text='Late post')
+        for url in urls.values():
+            self.assertEqual(self.client.get(url).status_code, 200)
+        detail = reverse('posts:post_detail', kwargs={'post_id': post.pk})
+        self.assertEqual(self.client.get(detail).status_code, 200)
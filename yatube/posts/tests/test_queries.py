@@ -0,0 +1,179 @@
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import urls as posts_urls
+from posts.models import Comment, Follow, Group, Post, User
+from users import urls as users_urls
+
+PAGE_SIZES = (2, 10)
+
+# Страницы, которые меняют состояние клиента: их меряем без прогрева.
+COLD_URLS = ('users:logout',)
+
+# Максимальное число SQL-запросов на один рендер страницы с прогретым
+# кешем (для гостя, для авторизованного пользователя). Сессия и
+# пользователь читаются из базы: это два запроса на каждый запрос
+# авторизованного пользователя; подписки без общего кеша — ещё один.
+QUERY_BUDGETS = {
+    'posts:index_page': (2, 4),
+    'posts:group_list': (2, 4),
+    'posts:profile': (2, 5),
+    'posts:post_detail': (3, 5),
+    'posts:post_create': (0, 3),
+    'posts:post_edit': (0, 4),
+    'posts:add_comment': (0, 3),
+    'posts:follow_index': (0, 6),
+    'posts:profile_follow': (0, 3),
+    'posts:profile_unfollow': (0, 3),
+    'posts:trending': (3, 5),
+    'posts:index_fragment': (0, 2),
+    'posts:group_fragment': (0, 2),
+    'posts:profile_fragment': (0, 2),
+    'posts:follow_fragment': (0, 3),
+    'users:password_change_done': (0, 2),
+    'users:password_change_form': (0, 2),
+    'users:logout': (0, 4),
+    'users:login': (0, 2),
+    'users:password_reset_form': (0, 2),
+    'users:signup': (0, 2),
+}
+
+# То же при пустом кеше: первый запрос после перезапуска или сброса кеша.
+COLD_QUERY_BUDGETS = {
+    'posts:index_page': (2, 4),
+    'posts:group_list': (3, 5),
+    'posts:profile': (3, 6),
+    'posts:post_detail': (4, 6),
+    'posts:post_create': (0, 3),
+    'posts:post_edit': (0, 4),
+    'posts:add_comment': (0, 3),
+    'posts:follow_index': (0, 6),
+    'posts:profile_follow': (0, 4),
+    'posts:profile_unfollow': (0, 11),
+    'posts:trending': (3, 5),
+    'posts:index_fragment': (1, 1),
+    'posts:group_fragment': (2, 2),
+    'posts:profile_fragment': (2, 2),
+    'posts:follow_fragment': (0, 3),
+    'users:password_change_done': (0, 2),
+    'users:password_change_form': (0, 2),
+    'users:logout': (0, 4),
+    'users:login': (0, 2),
+    'users:password_reset_form': (0, 2),
+    'users:signup': (0, 2),
+}
+
+
+class QueryBudgetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='budget_user', first_name='Budget', last_name='User')
+        cls.author = User.objects.create_user(username='budget_author')
+        cls.group = Group.objects.create(
+            title='Budget group',
+            slug='budget-slug',
+            description='Budget description',
+        )
+        posts = [
+            Post(
+                author=(cls.user, cls.author)[i % 2],
+                group=cls.group if i % 3 else None,
+                text=f'Budget post {i}',
+            )
+            for i in range(25)
+        ]
+        # bulk_create не вызывает save(): анонсы готовим сами, как у
+        # сохранённых через форму постов.
+        for post in posts:
+            post.render()
+        Post.objects.bulk_create(posts)
+        cls.post = Post.objects.filter(author=cls.user).first()
+        Comment.objects.bulk_create(
+            Comment(
+                post=cls.post,
+                author=(cls.user, cls.author)[i % 2],
+                text=f'Budget comment {i}',
+            )
+            for i in range(5)
+        )
+        Follow.objects.create(user=cls.user, author=cls.author)
+        cls.url_kwargs = {
+            'posts:post_edit': {'post_id': cls.post.pk},
+            'posts:add_comment': {'post_id': cls.post.pk},
+            'posts:group_list': {'slug': cls.group.slug},
+            'posts:profile': {'username': cls.author.username},
+            'posts:group_fragment': {'slug': cls.group.slug},
+            'posts:profile_fragment': {'username': cls.author.username},
+            'posts:post_detail': {'post_id': cls.post.pk},
+            'posts:profile_follow': {'username': cls.author.username},
+            'posts:profile_unfollow': {'username': cls.author.username},
+        }
+
+    def get_client(self, role):
+        client = Client()
+        if role == 'authorized':
+            client.force_login(self.user)
+        return client
+
+    def url_names(self):
+        for module in (posts_urls, users_urls):
+            for pattern in module.urlpatterns:
+                yield f'{module.app_name}:{pattern.name}'
+
+    def assert_budget(self, client, name, budget, query_string='',
+                      cold=False):
+        url = reverse(name, kwargs=self.url_kwargs.get(name))
+        if cold:
+            cache.clear()
+        elif name not in COLD_URLS:
+            client.get(url + query_string)
+        cache.delete(make_template_fragment_key('index_page'))
+        with CaptureQueriesContext(connection) as queries:
+            client.get(url + query_string)
+        executed = len(queries.captured_queries)
+        sql = '\n'.join(query['sql'] for query in queries.captured_queries)
+        self.assertLessEqual(
+            executed,
+            budget,
+            f'{url}{query_string}: {executed} SQL-запросов '
+            f'при бюджете {budget}:\n{sql}'
+        )
+
+    def test_every_url_has_budget(self):
+        for name in self.url_names():
+            with self.subTest(name=name):
+                self.assertIn(name, QUERY_BUDGETS)
+
+    def test_query_budgets(self):
+        for name in self.url_names():
+            for index, role in enumerate(('guest', 'authorized')):
+                for page_size in PAGE_SIZES:
+                    for query_string in ('', '?page=2'):
+                        with self.subTest(name=name, role=role,
+                                          page_size=page_size,
+                                          query_string=query_string):
+                            with override_settings(
+                                    DEFAULT_POSTS_PER_PAGE=page_size):
+                                self.assert_budget(
+                                    self.get_client(role),
+                                    name,
+                                    QUERY_BUDGETS[name][index],
+                                    query_string,
+                                )
+
+    def test_cold_query_budgets(self):
+        for name in self.url_names():
+            for index, role in enumerate(('guest', 'authorized')):
+                with self.subTest(name=name, role=role):
+                    self.assert_budget(
+                        self.get_client(role),
+                        name,
+                        COLD_QUERY_BUDGETS[name][index],
+                        cold=True,
+                    )
@@ -0,0 +1,39 @@
+from django.test import TestCase
+
+from posts.models import Group, Post, User
+from posts.readmodels import FEED_COLUMNS, PostRecord, post_records
+
+
+class ReadModelTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='reader', first_name='Иван', last_name='Петров')
+        cls.group = Group.objects.create(
+            title='Records', slug='records', description='Описание')
+        cls.posts = [
+            Post.objects.create(author=cls.user, group=group, text='Текст')
+            for group in (cls.group, None)
+        ]
+
+    def test_records_match_models(self):
+        records = post_records(Post.objects.values_list(*FEED_COLUMNS))
+        self.assertEqual(records, self.posts[::-1])
+        first, second = records
+        self.assertIsInstance(first, PostRecord)
+        self.assertIsNone(first.group_id)
+        self.assertEqual(second.group, self.group)
+        self.assertEqual(second.author, self.user)
+        self.assertIs(first.author, second.author)
+        self.assertEqual(second.author.get_full_name(), 'Иван Петров')
+        self.assertFalse(hasattr(first, '__dict__'))
+
+    def test_text_loaded_on_demand(self):
+        self.assertNotIn('text', FEED_COLUMNS)
+        record, = post_records(Post.objects.filter(
+            pk=self.posts[0].pk).values_list(*FEED_COLUMNS))
+        self.assertFalse(record.has_more)
+        with self.assertNumQueries(1):
+            self.assertEqual(record.text, 'Текст')
+            self.assertEqual(str(record), 'Текст')
@@ -0,0 +1,49 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Post, User
+
+
+@override_settings(POST_EXCERPT_LENGTH=20)
+class RenderedTextTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='renderer')
+
+    def test_save_renders_text(self):
+        post = Post.objects.create(author=self.user, text='<b>Да</b>\nнет')
+        self.assertEqual(post.text_html, '<p>&lt;b&gt;Да&lt;/b&gt;<br>нет</p>')
+        comment = Comment.objects.create(
+            post=post, author=self.user, text='Первый\n\nвторой')
+        self.assertEqual(comment.text_html, '<p>Первый</p>\n\n<p>второй</p>')
+
+    def test_feed_shows_excerpt_with_read_more(self):
+        cache.clear()
+        post = Post.objects.create(author=self.user, text='слово ' * 20)
+        self.assertEqual(post.excerpt, f'<p>{"слово " * 3}с…</p>')
+        self.assertTrue(post.has_more)
+        response = Client().get(reverse('posts:index_page'))
+        self.assertContains(response, post.excerpt)
+        self.assertContains(response, 'читать далее')
+        self.assertNotContains(response, post.text)
+
+    def test_backfill(self):
+        Post.objects.bulk_create(
+            Post(author=self.user, text=f'Пост {i}') for i in range(5))
+        call_command('backfill_text_html', '--batch-size', '2',
+                     stdout=StringIO())
+        self.assertFalse(Post.objects.filter(text_html='').exists())
+        self.assertEqual(
+            Post.objects.order_by('pk').first().excerpt, '<p>Пост 0</p>')
+        self.assertFalse(Post.objects.filter(has_more=True).exists())
+
+    def test_feed_falls_back_to_text(self):
+        cache.clear()
+        Post.objects.bulk_create([Post(author=self.user, text='Без анонса')])
+        response = Client().get(reverse('posts:index_page'))
+        self.assertContains(response, '<p>Без анонса</p>')
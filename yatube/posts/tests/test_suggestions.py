@@ -0,0 +1,135 @@
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.tasks import run_worker
+from posts.models import Comment, Follow, FollowSuggestion, Post, User
+from posts.suggestions import compute_scores
+
+
+class SuggestionTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.users = {
+            name: User.objects.create_user(username=name)
+            for name in ('ann', 'bob', 'cat', 'dan', 'eve')
+        }
+        cls.post = Post.objects.create(
+            author=cls.users['dan'], text='Commented post')
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.users['ann'])
+
+    def follow(self, user, author):
+        Follow.objects.create(user=self.users[user], author=self.users[author])
+
+    def comment(self, author):
+        Comment.objects.create(
+            post=self.post, author=self.users[author], text='Comment')
+
+    def scores(self):
+        return {
+            (s.user.username, s.candidate.username): s.score
+            for s in FollowSuggestion.objects.select_related(
+                'user', 'candidate')
+        }
+
+    def build_graph(self):
+        self.follow('ann', 'bob')
+        self.follow('bob', 'cat')
+        self.follow('bob', 'dan')
+        self.follow('eve', 'ann')
+        self.comment('ann')
+        self.comment('eve')
+        self.comment('eve')
+        self.comment('cat')
+
+    def test_incremental_scores(self):
+        self.build_graph()
+        scores = self.scores()
+        self.assertEqual(scores[('ann', 'cat')], 2)
+        self.assertEqual(scores[('ann', 'dan')], 1)
+        self.assertEqual(scores[('eve', 'bob')], 1)
+        self.assertEqual(scores[('ann', 'eve')], 1)
+        Follow.objects.filter(
+            user=self.users['bob'], author=self.users['dan']).delete()
+        self.assertNotIn(('ann', 'dan'), self.scores())
+
+    def test_recompute_matches_incremental(self):
+        self.build_graph()
+        incremental = self.scores()
+        FollowSuggestion.objects.all().delete()
+        call_command('recompute_suggestions', workers=1, chunk_size=2)
+        self.assertEqual(self.scores(), incremental)
+
+    def test_follow_index_shows_suggestions(self):
+        self.build_graph()
+        response = self.authorized_client.get(reverse('posts:follow_index'))
+        suggested = [
+            s.candidate.username for s in response.context['suggestions']]
+        self.assertEqual(suggested[0], 'cat')
+        self.assertNotIn('bob', suggested)
+
+    def test_follow_cost_independent_of_followers(self):
+        counts = []
+        for size in (2, 8):
+            author = User.objects.create_user(username=f'popular{size}')
+            target = User.objects.create_user(username=f'target{size}')
+            Follow.objects.bulk_create(
+                Follow(user=User.objects.create_user(
+                    username=f'fan{size}_{i}'), author=author)
+                for i in range(size))
+            with CaptureQueriesContext(connection) as queries:
+                Follow.objects.create(user=author, author=target)
+            counts.append(len(queries.captured_queries))
+            self.assertEqual(FollowSuggestion.objects.filter(
+                candidate=target, score=1).count(), size)
+        self.assertEqual(counts[0], counts[1])
+
+
+class SuggestionDeleteTests(TransactionTestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(username=f'commenter{i}')
+            for i in range(3)
+        ]
+        self.posts = [
+            Post.objects.create(author=self.users[0], text=f'Пост {i}')
+            for i in range(2)
+        ]
+        for post in self.posts:
+            for user in self.users:
+                Comment.objects.create(post=post, author=user, text='Да')
+
+    def scores(self):
+        return {
+            (user_id, candidate_id): score
+            for user_id, candidate_id, score in
+            FollowSuggestion.objects.values_list(
+                'user_id', 'candidate_id', 'score')
+        }
+
+    def assert_matches_recompute(self):
+        run_worker(until_empty=True)
+        expected = {
+            pair: score for pair, score in compute_scores(
+                [user.pk for user in self.users]).items()
+            if pair[0] != pair[1] and score > 0
+        }
+        self.assertEqual(self.scores(), expected)
+
+    def test_post_delete(self):
+        self.assertEqual(set(self.scores().values()), {2})
+        self.posts[0].delete()
+        self.assert_matches_recompute()
+        self.assertEqual(set(self.scores().values()), {1})
+
+    def test_queryset_delete(self):
+        Comment.objects.filter(author=self.users[1]).delete()
+        Post.objects.filter(pk=self.posts[1].pk).delete()
+        self.assert_matches_recompute()
+        self.assertEqual(len(self.scores()), 2)
@@ -0,0 +1,47 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+from posts.templatetags.post_cards import prepare_cards
+
+
+class PostCardsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='Юзер.name+1@x', first_name='Имя', last_name='')
+        cls.group = Group.objects.create(
+            title='Test title',
+            slug='cards-slug',
+            description='Test description',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, text='Card text', group=cls.group)
+        cls.post_without_group = Post.objects.create(
+            author=cls.user, text='No group')
+
+    def test_batch_urls_match_reverse(self):
+        cards = prepare_cards([self.post, self.post_without_group])
+        card = cards[self.post.pk]
+        test_data = {
+            card['profile_url']: reverse(
+                'posts:profile', args=[self.user.username]),
+            card['detail_url']: reverse(
+                'posts:post_detail', args=[self.post.pk]),
+            card['group_url']: reverse(
+                'posts:group_list', args=[self.group.slug]),
+            card['full_name']: self.user.get_full_name(),
+        }
+        for value, expected in test_data.items():
+            with self.subTest(expected=expected):
+                self.assertEqual(value, expected)
+        self.assertEqual(cards[self.post_without_group.pk]['group_url'], '')
+
+    def test_cards_rendered_on_feed(self):
+        response = self.client.get(
+            reverse('posts:profile', args=[self.user.username]))
+        self.assertContains(
+            response,
+            f'<a href="{reverse("posts:post_detail", args=[self.post.pk])}">'
+        )
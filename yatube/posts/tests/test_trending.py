@@ -0,0 +1,78 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts import trending
+from posts.models import Comment, Group, GroupTrend, Post, PostTrend, User
+
+
+@override_settings(TRENDING_HALF_LIFE=3600, TRENDING_POST_WEIGHT=1,
+                   TRENDING_COMMENT_WEIGHT=2, TRENDING_MIN_SCORE=0.01)
+class TrendingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='trend_user')
+        cls.group = Group.objects.create(
+            title='Trend group', slug='trend-slug', description='Описание')
+
+    def setUp(self):
+        cache.delete_many(
+            (trending.TRENDING_POSTS_KEY, trending.TRENDING_GROUPS_KEY))
+        self.post = Post.objects.create(
+            author=self.user, group=self.group, text='Trend post')
+
+    def score(self, model, pk, now=None):
+        return trending.score_at(
+            model.objects.get(pk=pk).rank, now or timezone.now())
+
+    def test_decay_halves_score(self):
+        now = timezone.now()
+        rank = trending.to_rank(8, now - timedelta(hours=2))
+        self.assertAlmostEqual(trending.score_at(rank, now), 2)
+
+    def test_events_bump_scores(self):
+        Comment.objects.create(post=self.post, author=self.user, text='Да')
+        self.assertAlmostEqual(
+            self.score(PostTrend, self.post.pk), 3, places=2)
+        self.assertAlmostEqual(
+            self.score(GroupTrend, self.group.pk), 3, places=2)
+
+    def test_bump_adds_to_decayed_score(self):
+        now = timezone.now()
+        trending.bump(PostTrend, self.post.pk, 3, now + timedelta(hours=1))
+        self.assertAlmostEqual(
+            self.score(PostTrend, self.post.pk, now + timedelta(hours=1)),
+            3.5, places=4)
+
+    def test_rollup_decays_and_drops_cold(self):
+        cold = Post.objects.create(author=self.user, text='Cold post')
+        PostTrend.objects.filter(post=cold).update(rank=trending.to_rank(
+            1, timezone.now() - timedelta(hours=10)))
+        rank = PostTrend.objects.get(post=self.post).rank
+        call_command('rollup_trending', stdout=StringIO())
+        self.assertFalse(PostTrend.objects.filter(post=cold).exists())
+        self.assertEqual(PostTrend.objects.get(post=self.post).rank, rank)
+        self.assertEqual(
+            cache.get(trending.TRENDING_POSTS_KEY), [self.post.pk])
+
+    def test_page_orders_by_score(self):
+        hot = Post.objects.create(author=self.user, text='Hot post')
+        Comment.objects.create(post=hot, author=self.user, text='Да')
+        response = Client().get(reverse('posts:trending'))
+        self.assertEqual(response.context['posts'], [hot, self.post])
+        self.assertEqual(response.context['groups'], [self.group])
+
+    def test_rebuild_applies_decay(self):
+        stale = Post.objects.create(author=self.user, text='Stale post')
+        PostTrend.objects.filter(post=stale).update(rank=trending.to_rank(
+            4, timezone.now() - timedelta(hours=3)))
+        with self.assertNumQueries(2):
+            top = trending.rebuild_top()
+        self.assertEqual(top[trending.TRENDING_POSTS_KEY],
+                         [self.post.pk, stale.pk])
@@ -0,0 +1,97 @@
+import os
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import viewcounts
+from posts.models import Post, User
+
+
+class StopAfter:
+    def __init__(self, rounds):
+        self.rounds = rounds
+
+    def wait(self, timeout):
+        self.rounds -= 1
+        return self.rounds < 0
+
+
+class ViewCountTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        viewcounts.flush()
+        cls.user = User.objects.create_user(username='viewer')
+        cls.posts = [
+            Post.objects.create(author=cls.user, text=f'Post {i}')
+            for i in range(2)
+        ]
+
+    def setUp(self):
+        self.client = Client()
+
+    def tearDown(self):
+        viewcounts.flush()
+
+    def open(self, post):
+        return self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': post.pk}))
+
+    def test_views_are_buffered_until_flush(self):
+        first, second = self.posts
+        for _ in range(3):
+            self.open(first)
+        response = self.open(second)
+        self.assertEqual(response.context['post'].views, 1)
+        first.refresh_from_db()
+        self.assertEqual(first.views, 0)
+        with self.assertNumQueries(1):
+            self.assertEqual(viewcounts.flush(), 2)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.views, second.views), (3, 1))
+
+    def test_periodic_flush(self):
+        self.open(self.posts[0])
+        viewcounts.flush_periodically(StopAfter(1), 0)
+        self.posts[0].refresh_from_db()
+        self.assertEqual(self.posts[0].views, 1)
+
+    def test_flusher_started_once_per_process(self):
+        post = self.posts[0]
+        with mock.patch.object(viewcounts, '_flusher_enabled', True), \
+                mock.patch.object(viewcounts, '_flusher_pid', None), \
+                mock.patch('threading.Thread') as thread, \
+                mock.patch('atexit.register'), \
+                mock.patch('os.getpid', return_value=100):
+            viewcounts.hit(post.pk)
+            viewcounts.hit(post.pk)
+            self.assertEqual(thread.return_value.start.call_count, 1)
+            # Дочерний процесс после fork запускает свой поток.
+            os.getpid.return_value = 101
+            viewcounts.hit(post.pk)
+            self.assertEqual(thread.return_value.start.call_count, 2)
+
+    def test_failed_flush_keeps_counts(self):
+        post = self.posts[1]
+        self.open(post)
+        with mock.patch('django.db.models.query.QuerySet.update',
+                        side_effect=DatabaseError('locked')):
+            with self.assertLogs('posts.viewcounts', level='ERROR'):
+                self.assertEqual(viewcounts.flush(), 0)
+        self.assertEqual(viewcounts.pending(post.pk), 1)
+        self.assertEqual(viewcounts.flush(), 1)
+        post.refresh_from_db()
+        self.assertEqual(post.views, 1)
+
+    def test_most_viewed_ranking(self):
+        cache.clear()
+        first, second = self.posts
+        Post.objects.filter(pk=first.pk).update(views=2)
+        Post.objects.filter(pk=second.pk).update(views=5)
+        response = self.client.get(reverse('posts:trending'))
+        self.assertEqual(response.context['most_viewed'], [second, first])
+        self.assertContains(response, 'Просмотров: 5')
@@ -1,5 +1,6 @@
 import shutil
 import tempfile
+from array import array
 
 from django import forms
 from django.conf import settings
@@ -9,6 +10,7 @@ from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
 from posts.models import Group, Post, User, Follow
+from posts.follows import following_key, following_many, is_following
 from posts.forms import PostForm
 
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
@@ -244,3 +246,71 @@ class FollowViewsTest(TestCase):
             reverse('posts:follow_index'))
         new_post_unfollower = response_unfollower.context['page_obj']
         self.assertNotIn(new_post_follower, new_post_unfollower)
+
+
+@override_settings(FOLLOWING_CACHE_ENABLED=True)
+class FollowCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='reader')
+        cls.authors = [
+            User.objects.create_user(username=f'writer{i}') for i in range(3)
+        ]
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def fresh_user(self):
+        return User.objects.get(pk=self.user.pk)
+
+    def test_following_answered_from_memory(self):
+        Follow.objects.create(user=self.user, author=self.authors[1])
+        user = self.fresh_user()
+        is_following(user, self.authors[0])
+        ids = [author.pk for author in self.authors]
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                following_many(user, ids),
+                {ids[0]: False, ids[1]: True, ids[2]: False},
+            )
+            self.assertTrue(
+                is_following(User(pk=self.user.pk), self.authors[1].pk))
+
+    def test_follow_and_unfollow_invalidate(self):
+        author = self.authors[2]
+        self.assertFalse(is_following(self.fresh_user(), author))
+        self.authorized_client.get(
+            reverse('posts:profile_follow', args=[author.username]))
+        self.assertTrue(is_following(self.fresh_user(), author))
+        self.authorized_client.get(
+            reverse('posts:profile_unfollow', args=[author.username]))
+        self.assertFalse(is_following(self.fresh_user(), author))
+
+    def test_follow_writes_despite_stale_cache(self):
+        author = self.authors[0]
+        # Кеш подписок другого процесса: в нём уже есть подписка,
+        # которой нет в базе.
+        cache.set(following_key(self.user.pk),
+                  array('q', [author.pk]).tobytes())
+        self.authorized_client.get(
+            reverse('posts:profile_follow', args=[author.username]))
+        self.assertTrue(Follow.objects.filter(
+            user=self.user, author=author).exists())
+        Follow.objects.filter(user=self.user, author=author).delete()
+        cache.set(following_key(self.user.pk), array('q').tobytes())
+        Follow.objects.bulk_create([Follow(user=self.user, author=author)])
+        self.authorized_client.get(
+            reverse('posts:profile_unfollow', args=[author.username]))
+        self.assertFalse(Follow.objects.filter(
+            user=self.user, author=author).exists())
+        self.assertFalse(is_following(self.fresh_user(), author))
+
+    @override_settings(FOLLOWING_CACHE_ENABLED=False)
+    def test_cache_ignored_without_shared_cache(self):
+        author = self.authors[0]
+        Follow.objects.create(user=self.user, author=author)
+        # Запись из кеша процесса, который не видел новую подписку.
+        cache.set(following_key(self.user.pk), array('q').tobytes())
+        self.assertTrue(is_following(self.fresh_user(), author))
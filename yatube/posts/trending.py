@@ -0,0 +1,102 @@
+import math
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import Log, Power
+from django.utils import timezone
+
+from .models import Group, GroupTrend, Post, PostTrend
+
+TRENDING_POSTS_KEY = 'trending:posts'
+TRENDING_GROUPS_KEY = 'trending:groups'
+
+
+# В базе хранится не счёт, а rank = log2(счёт) + t / период полураспада,
+# где t — время от эпохи. Затухание сдвигает все счета одинаково, поэтому
+# порядок по rank совпадает с порядком по текущему счёту и не требует
+# пересчёта строк. При смене TRENDING_HALF_LIFE ранги надо пересчитать.
+def offset(now):
+    return now.timestamp() / settings.TRENDING_HALF_LIFE
+
+
+def to_rank(score, now):
+    return math.log2(score) + offset(now)
+
+
+def score_at(rank, now):
+    return 2 ** (rank - offset(now))
+
+
+def bump(model, pk, weight, now=None):
+    now = now or timezone.now()
+    shift = offset(now)
+    # Одним UPDATE: одновременные события не затирают прибавки друг друга.
+    rank = Log(
+        Value(2.0),
+        Power(Value(2.0), F('rank') - Value(shift)) + Value(float(weight)),
+        output_field=FloatField(),
+    ) + Value(shift)
+    if model.objects.filter(pk=pk).update(rank=rank, updated=now):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(
+                pk=pk, rank=to_rank(weight, now), updated=now)
+    except IntegrityError:
+        model.objects.filter(pk=pk).update(rank=rank, updated=now)
+
+
+def post_created(post):
+    bump(PostTrend, post.pk, settings.TRENDING_POST_WEIGHT)
+    if post.group_id:
+        bump(GroupTrend, post.group_id, settings.TRENDING_POST_WEIGHT)
+
+
+def comment_created(comment):
+    post = comment.post
+    bump(PostTrend, post.pk, settings.TRENDING_COMMENT_WEIGHT)
+    if post.group_id:
+        bump(GroupTrend, post.group_id, settings.TRENDING_COMMENT_WEIGHT)
+
+
+def rollup(now=None):
+    # Ранги не устаревают, поэтому строки не переписываются: удаляем
+    # только остывшие, параллельные bump ничего не теряют.
+    now = now or timezone.now()
+    cold = to_rank(settings.TRENDING_MIN_SCORE, now)
+    for model in (PostTrend, GroupTrend):
+        model.objects.filter(rank__lt=cold).delete()
+    return rebuild_top()
+
+
+def rebuild_top():
+    limit = settings.TRENDING_LIMIT
+    top = {
+        TRENDING_POSTS_KEY: list(PostTrend.objects.order_by(
+            '-rank').values_list('post_id', flat=True)[:limit]),
+        TRENDING_GROUPS_KEY: list(GroupTrend.objects.order_by(
+            '-rank').values_list('group_id', flat=True)[:limit]),
+    }
+    cache.set_many(top, settings.TRENDING_CACHE_TIMEOUT)
+    return top
+
+
+def top_ids():
+    top = cache.get_many((TRENDING_POSTS_KEY, TRENDING_GROUPS_KEY))
+    if len(top) < 2:
+        top = rebuild_top()
+    return top[TRENDING_POSTS_KEY], top[TRENDING_GROUPS_KEY]
+
+
+def in_order(objects, ids):
+    return [objects[pk] for pk in ids if pk in objects]
+
+
+def trending():
+    post_ids, group_ids = top_ids()
+    posts = Post.objects.select_related('author', 'group').defer(
+        'text', 'text_html').in_bulk(post_ids)
+    groups = Group.objects.in_bulk(group_ids)
+    return in_order(posts, post_ids), in_order(groups, group_ids)
@@ -13,9 +13,16 @@ urlpatterns = [
     path('profile/<str:username>/', views.profile, name='profile'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('follow/', views.follow_index, name='follow_index'),
+    path('trending/', views.trending, name='trending'),
     path('profile/<str:username>/follow/',
          views.profile_follow, name='profile_follow'),
     path('profile/<str:username>/unfollow/',
          views.profile_unfollow, name="profile_unfollow"),
+    path('fragments/index/', views.index_fragment, name='index_fragment'),
+    path('fragments/group/<slug:slug>/',
+         views.group_fragment, name='group_fragment'),
+    path('fragments/profile/<str:username>/',
+         views.profile_fragment, name='profile_fragment'),
+    path('fragments/follow/', views.follow_fragment, name='follow_fragment'),
     path('', views.index, name='index_page'),
 ]
@@ -1,8 +1,18 @@
 from django.conf import settings
 from django.core.paginator import Paginator
+from django.utils.html import linebreaks
+from django.utils.text import Truncator
 
 
 def base_paginator(request, posts):
     paginator = Paginator(posts, settings.DEFAULT_POSTS_PER_PAGE)
     page_number = request.GET.get('page')
     return paginator.get_page(page_number)
+
+
+def render_text(text):
+    return linebreaks(text, autoescape=True)
+
+
+def render_excerpt(text):
+    return render_text(Truncator(text).chars(settings.POST_EXCERPT_LENGTH))
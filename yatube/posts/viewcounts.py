@@ -0,0 +1,101 @@
+import atexit
+import logging
+import os
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.db.models import Case, F, IntegerField, Value, When
+
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+MOST_VIEWED_KEY = 'viewcounts:most_viewed'
+
+# Просмотры копятся в памяти процесса, а фоновый поток пишет их в базу
+# одним UPDATE раз в VIEW_COUNTS_FLUSH_INTERVAL секунд: при падении
+# процесса теряем не больше одного интервала.
+_buffer = Counter()
+_lock = threading.Lock()
+_flusher_enabled = False
+_flusher_pid = None
+
+
+def hit(post_id):
+    with _lock:
+        _buffer[post_id] += 1
+        if _flusher_enabled and _flusher_pid != os.getpid():
+            _start_flusher()
+
+
+def pending(post_id):
+    with _lock:
+        return _buffer.get(post_id, 0)
+
+
+def flush():
+    global _buffer
+    with _lock:
+        buffered, _buffer = _buffer, Counter()
+    if not buffered:
+        return 0
+    try:
+        Post.objects.filter(pk__in=buffered).update(views=F('views') + Case(
+            *(When(pk=pk, then=Value(count))
+              for pk, count in buffered.items()),
+            default=Value(0),
+            output_field=IntegerField(),
+        ))
+    except DatabaseError:
+        # Возвращаем просмотры в буфер: запишем со следующей попыткой.
+        logger.exception('Не удалось сохранить просмотры')
+        with _lock:
+            _buffer.update(buffered)
+        return 0
+    return len(buffered)
+
+
+def flush_periodically(stop, interval):
+    while not stop.wait(interval):
+        flush()
+
+
+def enable_flusher():
+    # Вызывается из WSGI-приложения: у тестов и management-команд своего
+    # потока нет. Сам поток запускается при первом просмотре в каждом
+    # процессе: сервер может импортировать приложение до fork, а потоки
+    # в дочерние процессы не копируются.
+    global _flusher_enabled
+    _flusher_enabled = True
+
+
+def _start_flusher():
+    # Вызывается под _lock.
+    global _flusher_pid
+    _flusher_pid = os.getpid()
+    threading.Thread(
+        target=flush_periodically,
+        args=(threading.Event(), settings.VIEW_COUNTS_FLUSH_INTERVAL),
+        name='viewcounts-flusher',
+        daemon=True,
+    ).start()
+    atexit.register(flush)
+
+
+def most_viewed_ids():
+    ids = cache.get(MOST_VIEWED_KEY)
+    if ids is None:
+        ids = list(Post.objects.order_by('-views').filter(
+            views__gt=0).values_list('pk', flat=True)[
+                :settings.MOST_VIEWED_LIMIT])
+        cache.set(MOST_VIEWED_KEY, ids, settings.MOST_VIEWED_CACHE_TIMEOUT)
+    return ids
+
+
+def most_viewed():
+    ids = most_viewed_ids()
+    posts = Post.objects.only('id', 'excerpt', 'views').in_bulk(ids)
+    return [posts[pk] for pk in ids if pk in posts]
@@ -1,15 +1,23 @@
 from django.shortcuts import get_object_or_404, render, redirect
 from django.contrib.auth.decorators import login_required
+from django.http import Http404
+
+from core import negative
 
 from .models import Group, Post, User, Follow
+from .entities import get_group_or_404, get_many, get_user, get_user_or_404
+from .follows import invalidate_following
 from .forms import PostForm, CommentForm
-from .utils import base_paginator
+from .fragments import render_fragment
+from .readmodels import feed_page
+from .suggestions import suggested_authors
+from .trending import trending as trending_posts
+from .viewcounts import hit, most_viewed, pending
 
 
 def index(request):
     template = 'posts/index.html'
-    posts = Post.objects.all()
-    page_obj = base_paginator(request, posts)
+    page_obj = feed_page(request, Post.objects.all())
     context = {
         'page_obj': page_obj,
     }
@@ -18,9 +26,8 @@ def index(request):
 
 def group_posts(request, slug):
     template = 'posts/group_list.html'
-    group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
-    page_obj = base_paginator(request, posts)
+    group = get_group_or_404(slug)
+    page_obj = feed_page(request, group.posts.all())
     context = {
         'group': group,
         'page_obj': page_obj,
@@ -30,27 +37,28 @@ def group_posts(request, slug):
 
 def profile(request, username):
     template = 'posts/profile.html'
-    author = get_object_or_404(User, username=username)
-    posts = author.posts.all()
-    page_obj = base_paginator(request, posts)
-    following = (
-        request.user.is_authenticated and Follow.objects.filter(
-            user=request.user,
-            author=author
-        ).exists()
-    )
+    author = get_user_or_404(username)
+    page_obj = feed_page(request, author.posts.all())
     context = {
         'author': author,
         'page_obj': page_obj,
-        'following': following,
     }
     return render(request, template, context)
 
 
 def post_detail(request, post_id):
     template = 'posts/post_detail.html'
-    post = get_object_or_404(Post, pk=post_id)
-    comments = post.comments.all()
+    negative.check('posts.post', post_id)
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None:
+        negative.remember('posts.post', post_id)
+        raise Http404('Пост не найден')
+    post.author = get_many(User, [post.author_id])[post.author_id]
+    if post.group_id:
+        post.group = get_many(Group, [post.group_id])[post.group_id]
+    hit(post.pk)
+    post.views += pending(post.pk)
+    comments = post.comments.select_related('author')
     form = CommentForm()
     context = {
         'post': post,
@@ -60,6 +68,17 @@ def post_detail(request, post_id):
     return render(request, template, context)
 
 
+def trending(request):
+    template = 'posts/trending.html'
+    posts, groups = trending_posts()
+    context = {
+        'posts': posts,
+        'groups': groups,
+        'most_viewed': most_viewed(),
+    }
+    return render(request, template, context)
+
+
 @login_required
 def post_create(request):
     template = 'posts/create_post.html'
@@ -81,7 +100,8 @@ def post_create(request):
 @login_required
 def post_edit(request, post_id):
     template = 'posts/create_post.html'
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related('author'), pk=post_id)
     if post.author != request.user:
         return redirect('posts:profile', username=post.author)
     form = PostForm(
@@ -116,22 +136,55 @@ def add_comment(request, post_id):
 def follow_index(request):
     template = 'posts/follow_index.html'
     posts_list = Post.objects.filter(author__following__user=request.user)
-    page = base_paginator(request, posts_list)
-    context = {"page_obj": page}
+    page = feed_page(request, posts_list)
+    context = {
+        "page_obj": page,
+        "suggestions": suggested_authors(request.user),
+    }
     return render(request, template, context)
 
 
+def index_fragment(request):
+    return render_fragment(
+        request, 'index', Post.objects.all(), page_with_links=True)
+
+
+def group_fragment(request, slug):
+    group = get_group_or_404(slug)
+    return render_fragment(request, f'group:{group.pk}', group.posts.all())
+
+
+def profile_fragment(request, username):
+    author = get_user_or_404(username)
+    return render_fragment(
+        request, f'profile:{author.pk}', author.posts.all(),
+        page_with_links=True, is_profile=True)
+
+
+@login_required
+def follow_fragment(request):
+    posts_list = Post.objects.filter(author__following__user=request.user)
+    return render_fragment(
+        request, f'follow:{request.user.pk}', posts_list, public=False,
+        page_with_links=True)
+
+
 @login_required
 def profile_follow(request, username):
-    author = get_object_or_404(User, username=username)
+    author = get_user_or_404(username)
     user = request.user
+    # Пишем всегда: кеш подписок в другом процессе может быть устаревшим,
+    # а повторная запись безопасна.
     if author != user:
         Follow.objects.get_or_create(user=user, author=author)
+        invalidate_following(user.pk)
     return redirect("posts:profile", username=username)
 
 
 @login_required
 def profile_unfollow(request, username):
-    Follow.objects.filter(
-        user=request.user, author__username=username).delete()
+    author = get_user(username)
+    if author is not None:
+        Follow.objects.filter(user=request.user, author=author).delete()
+        invalidate_following(request.user.pk)
     return redirect("posts:profile", username=username)
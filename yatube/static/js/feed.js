@@ -0,0 +1,43 @@
+// Бесконечная лента: без JavaScript остаётся обычный пагинатор.
+(function () {
+  var more = document.querySelector('.js-feed-more');
+  if (!more || !('IntersectionObserver' in window) || !window.fetch) {
+    return;
+  }
+  var pagination = document.querySelector('nav[aria-label="Page navigation"]');
+  if (pagination) {
+    pagination.hidden = true;
+  }
+  var loading = false;
+  var observer = new IntersectionObserver(function (entries) {
+    if (!entries[0].isIntersecting || loading) {
+      return;
+    }
+    loading = true;
+    var url = more.dataset.url + '?cursor=' + encodeURIComponent(more.dataset.cursor);
+    fetch(url, {credentials: 'same-origin'})
+      .then(function (response) {
+        if (!response.ok) {
+          throw new Error(response.status);
+        }
+        return response.json();
+      })
+      .then(function (data) {
+        more.insertAdjacentHTML('beforebegin', '<hr>' + data.html);
+        if (data.next) {
+          more.dataset.cursor = data.next;
+          loading = false;
+        } else {
+          observer.disconnect();
+          more.remove();
+        }
+      })
+      .catch(function () {
+        observer.disconnect();
+        if (pagination) {
+          pagination.hidden = false;
+        }
+      });
+  }, {rootMargin: '600px'});
+  observer.observe(more);
+})();
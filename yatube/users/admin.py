@@ -0,0 +1,34 @@
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+
+from posts import bulk
+from posts.admin import QueuedDeleteMixin, queued
+from posts.models import BulkJob, Comment, Follow, Post
+
+User = get_user_model()
+
+
+class UserAdmin(QueuedDeleteMixin, BaseUserAdmin):
+    # Удаление пользователя каскадом проходит по всем его постам,
+    # комментариям и подпискам: только через фоновую операцию.
+    actions = ('queue_purge',)
+    job_permissions = (
+        ('delete', Post), ('delete', Comment), ('delete', Follow),
+    )
+
+    def delete_job(self, request, obj):
+        return bulk.enqueue(
+            BulkJob.PURGE_USER, created_by=request.user, user_id=obj.pk)
+
+    def queue_purge(self, request, queryset):
+        if not self.check_job_permissions(request):
+            return
+        for user in queryset:
+            queued(request, self.delete_job(request, user))
+    queue_purge.short_description = 'Удалить вместе с записями в фоне'
+    queue_purge.allowed_permissions = ('delete',)
+
+
+admin.site.unregister(User)
+admin.site.register(User, UserAdmin)
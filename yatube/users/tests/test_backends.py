@@ -0,0 +1,47 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+
+from users.backends import CachedModelBackend, user_cache_key
+
+User = get_user_model()
+
+
+# В настройках по умолчанию кеш авторизации выключен: включаем его
+# для всего класса, чтобы и вход в setUp шёл через кеширующий бэкенд.
+@override_settings(
+    AUTHENTICATION_BACKENDS=['users.backends.CachedModelBackend'],
+    SESSION_ENGINE='django.contrib.sessions.backends.cached_db',
+)
+class CachedModelBackendTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='cached', password='old-password-123')
+
+    def setUp(self):
+        self.backend = CachedModelBackend()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_user_served_from_cache(self):
+        self.backend.get_user(self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.backend.get_user(self.user.pk), self.user)
+
+    def test_cache_invalidated_on_save(self):
+        self.backend.get_user(self.user.pk)
+        self.user.first_name = 'Renamed'
+        self.user.save()
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+        self.assertEqual(
+            self.backend.get_user(self.user.pk).first_name, 'Renamed')
+
+    def test_password_change_logs_out_other_sessions(self):
+        response = self.authorized_client.get('/create/')
+        self.assertEqual(response.status_code, 200)
+        self.user.set_password('new-password-456')
+        self.user.save()
+        response = self.authorized_client.get('/create/')
+        self.assertEqual(response.status_code, 302)
@@ -46,7 +46,12 @@ ALLOWED_HOSTS = [
     'testserver',
 ]
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_BACKEND = 'core.mail.QueuedEmailBackend'
+EMAIL_DELIVERY_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_BATCH_SIZE = 100
+EMAIL_MAX_ATTEMPTS = 5
+
+SITE_URL = 'http://127.0.0.1:8000'
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
@@ -67,11 +72,18 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.CompressionMiddleware',
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.ProfilingMiddleware',
+    'core.middleware.SlowQueryMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.RateLimitMiddleware',
+    'core.middleware.SplitChromeMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -105,9 +117,66 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
+        'CONN_MAX_AGE': 60,
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db_replica.sqlite3'),
+        'CONN_MAX_AGE': 60,
+        # В тестах реплика — отдельный файл, который наполняет
+        # sync_replica.
+        'TEST': {
+            'NAME': os.path.join(BASE_DIR, 'test_db_replica.sqlite3'),
+        },
+    },
 }
 
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+
+REPLICA_DATABASE = 'replica'
+# Реплика старше REPLICA_MAX_LAG секунд не читается; закрепление за
+# основной базой после записи должно перекрывать это отставание.
+REPLICA_MAX_LAG = 5
+REPLICA_PIN_SECONDS = 10
+PRIMARY_ONLY_APPS = ('auth', 'sessions', 'contenttypes')
+REPLICA_READ_VIEWS = (
+    'posts:index_page',
+    'posts:group_list',
+    'posts:profile',
+    'posts:post_detail',
+    'posts:follow_index',
+    'posts:trending',
+)
+REPLICA_WRITE_VIEWS = (
+    'posts:post_create',
+    'posts:post_edit',
+    'posts:add_comment',
+    'posts:profile_follow',
+    'posts:profile_unfollow',
+)
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 128 * 1024 * 1024,
+    'cache_size': -20000,
+    'temp_store': 'MEMORY',
+}
+
+# Сессии и пользователя можно держать в кеше, только если он общий для
+# всех процессов: с LocMemCache выход, смена пароля и блокировка
+# сбрасывают кеш лишь в том процессе, который их обработал.
+AUTH_CACHE_ENABLED = False
+
+if AUTH_CACHE_ENABLED:
+    AUTHENTICATION_BACKENDS = ['users.backends.CachedModelBackend']
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+USER_CACHE_TIMEOUT = 60 * 15
+
+SESSION_SAVE_EVERY_REQUEST = False
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -148,6 +217,44 @@ USE_TZ = True
 STATIC_URL = '/static/'
 
 DEFAULT_POSTS_PER_PAGE = 10
+POST_EXCERPT_LENGTH = 500
+FRAGMENT_CACHE_TIMEOUT = 20
+
+# Кеш подписок сбрасывается только в процессе, обработавшем запись:
+# включать вместе с общим для всех процессов кешем (Redis, memcached).
+FOLLOWING_CACHE_ENABLED = False
+FOLLOWING_CACHE_TIMEOUT = 60 * 60
+ENTITY_CACHE_TIMEOUT = 60 * 60
+NEGATIVE_CACHE_TIMEOUT = 60
+
+SUGGESTIONS_LIMIT = 5
+SUGGESTION_FOLLOW_WEIGHT = 1
+SUGGESTION_COMMENT_WEIGHT = 1
+
+TRENDING_HALF_LIFE = 60 * 60 * 6
+TRENDING_POST_WEIGHT = 1
+TRENDING_COMMENT_WEIGHT = 2
+TRENDING_MIN_SCORE = 0.01
+TRENDING_LIMIT = 20
+TRENDING_CACHE_TIMEOUT = 60 * 15
+
+VIEW_COUNTS_FLUSH_INTERVAL = 10
+MOST_VIEWED_LIMIT = 10
+MOST_VIEWED_CACHE_TIMEOUT = 60 * 5
+
+ADMIN_COUNT_CACHE_TIMEOUT = 60
+ADMIN_CHOICES_TIMEOUT = 60 * 60
+
+BULK_JOB_CHUNK_SIZE = 500
+BULK_JOB_CHUNKS_PER_TASK = 10
+
+DIGEST_BATCH_SIZE = 500
+DIGEST_MAX_POSTS = 20
+
+TASK_MAX_ATTEMPTS = 3
+TASK_RETRY_BACKOFF = 10
+TASK_LOCK_TIMEOUT = 60 * 10
+TASK_POLL_INTERVAL = 1
 
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index_page'
@@ -155,4 +262,43 @@ LOGIN_REDIRECT_URL = 'posts:index_page'
 PASSWORD_CHANGE_URL = 'users:password_change_form'
 PASSWORD_CHANGE_DONE_URL = 'users:password_change_done'
 
+PROFILING_ENABLED = DEBUG
+PROFILING_LOG_SAMPLE_RATE = 0.1
+
+METRICS_ENABLED = True
+METRICS_DIR = os.path.join(BASE_DIR, 'metrics')
+METRICS_FLUSH_INTERVAL = 5
+METRICS_TOKEN = None
+
+SLOW_QUERY_THRESHOLD_MS = 100
+
+# Лимиты запросов по имени маршрута: отдельно на пользователя и на IP.
+# Счётчики хранятся в кеше RATELIMIT_CACHE; с LocMemCache лимит считается
+# в каждом процессе отдельно, для общего лимита нужен общий кеш
+# (memcached или Redis).
+RATELIMIT_CACHE = 'default'
+RATELIMITS = {
+    'posts:add_comment': {
+        'user': '10/m', 'ip': '60/m', 'methods': ('POST',)},
+    'posts:post_create': {
+        'user': '5/m', 'ip': '30/m', 'methods': ('POST',)},
+    'posts:profile_follow': {'user': '30/m', 'ip': '120/m'},
+}
+
+# Раздельный рендер: тело страницы кешируется одно на всех, а шапка и
+# кнопки подставляются для каждого пользователя. Страница поста не входит
+# в список: она считает просмотры и содержит форму комментария с CSRF.
+SPLIT_CHROME_ENABLED = False
+SPLIT_CHROME_VIEWS = (
+    'posts:index_page',
+    'posts:group_list',
+    'posts:profile',
+    'posts:trending',
+)
+SPLIT_CHROME_TIMEOUT = 20
+
+# Минификация HTML и gzip для ответов не короче COMPRESSION_MIN_SIZE байт.
+COMPRESSION_ENABLED = True
+COMPRESSION_MIN_SIZE = 200
+
 # LOGOUT_REDIRECT_URL = 'posts:index'